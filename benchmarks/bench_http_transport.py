@@ -0,0 +1,189 @@
+"""
+Benchmark bytes on the wire for the Streamable HTTP transport.
+
+Usage:
+    python benchmarks/bench_http_transport.py [--rounds 50] [--port 8765]
+
+Starts ``python -m cockpit_design_aesthetics --http`` locally and replays an
+agent-like workload (static lookups repeated every round plus a spread of
+instrument and panel queries) over a single keep-alive connection, once per
+client mode:
+
+    plain        no compression, no revalidation
+    gzip / zstd  Accept-Encoding negotiated compression
+    etag         If-None-Match revalidation of results already held
+    etag+gzip    both
+
+Bytes are counted at the socket, so they include request and response
+headers. zstd is skipped unless the ``zstandard`` package is installed.
+"""
+
+import argparse
+import http.client
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+STATIC_CALLS = [
+    ("list_available_options", {}),
+    ("get_color_standards", {}),
+    ("get_panel_layout_rules", {}),
+]
+AIRCRAFT = [
+    "general_aviation_singles", "general_aviation_twins", "light_commercial",
+    "commercial_airliners", "fighter_jets", "helicopters",
+]
+ERAS = ["analog_mechanical", "glass_cockpit", "hud_integration", "modern_synthetic_vision"]
+INSTRUMENTS = ["attitude_indicator", "altimeter", "airspeed_indicator", "heading_indicator"]
+
+
+def workload(rounds: int) -> list:
+    calls = []
+    for i in range(rounds):
+        calls.extend(STATIC_CALLS)
+        calls.append(("get_instrument_details", {"instrument_name": INSTRUMENTS[i % len(INSTRUMENTS)]}))
+        calls.append(("build_panel_specification", {
+            "aircraft_type": AIRCRAFT[i % len(AIRCRAFT)], "panel_era": ERAS[i // len(AIRCRAFT) % len(ERAS)]
+        }))
+    return calls
+
+
+class _CountingSocket:
+    """Socket proxy that tallies bytes sent and received."""
+
+    def __init__(self, sock):
+        self._sock = sock
+        self.sent = 0
+        self.received = 0
+
+    def sendall(self, data):
+        self.sent += len(data)
+        return self._sock.sendall(data)
+
+    def recv_into(self, buffer, nbytes=0):
+        count = self._sock.recv_into(buffer, nbytes)
+        self.received += count
+        return count
+
+    def makefile(self, mode="r", buffering=None):
+        return io.BufferedReader(socket.SocketIO(self, "rb"))
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+
+class CountingConnection(http.client.HTTPConnection):
+    connects = 0
+
+    def connect(self):
+        super().connect()
+        self.sock = _CountingSocket(self.sock)
+        CountingConnection.connects += 1
+
+
+def run_mode(port: int, calls: list, accept_encoding: str, conditional: bool) -> dict:
+    CountingConnection.connects = 0
+    conn = CountingConnection("127.0.0.1", port)
+    held = {}  # (tool, args) -> etag of a result the client already has
+    sent = received = not_modified = 0
+    start = time.perf_counter()
+    for request_id, (name, arguments) in enumerate(calls):
+        headers = {
+            "content-type": "application/json",
+            "accept": "application/json, text/event-stream",
+            "accept-encoding": accept_encoding,
+        }
+        key = (name, json.dumps(arguments, sort_keys=True))
+        if conditional and key in held:
+            headers["if-none-match"] = held[key]
+        body = json.dumps({
+            "jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+            "params": {"name": name, "arguments": arguments}
+        })
+        conn.request("POST", "/mcp", body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        if response.status == 304:
+            not_modified += 1
+        elif response.status != 200:
+            raise RuntimeError(f"{name}: HTTP {response.status}")
+        elif response.getheader("etag"):
+            held[key] = response.getheader("etag")
+        # Counts of the socket in use; a reconnect would start a new proxy
+        sent, received = conn.sock.sent, conn.sock.received
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return {
+        "sent": sent, "received": received, "not_modified": not_modified,
+        "connections": CountingConnection.connects, "ms_per_call": elapsed * 1000 / len(calls)
+    }
+
+
+def wait_for_server(port: int, proc: subprocess.Popen) -> None:
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    try:
+        import zstandard  # noqa: F401
+        has_zstd = True
+    except ImportError:
+        has_zstd = False
+
+    modes = [("plain", "identity", False), ("gzip", "gzip", False)]
+    if has_zstd:
+        modes.append(("zstd", "zstd", False))
+    modes += [("etag", "identity", True), ("etag+gzip", "gzip", True)]
+    if has_zstd:
+        modes.append(("etag+zstd", "zstd", True))
+
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src")}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "cockpit_design_aesthetics", "--http", "--port", str(args.port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_server(args.port, proc)
+        calls = workload(args.rounds)
+        run_mode(args.port, calls[:20], "identity", False)  # warm the server's result cache
+
+        print(f"{len(calls)} calls over one keep-alive connection per mode")
+        print(f"{'mode':<10} {'sent KB':>9} {'recv KB':>9} {'total KB':>9} {'vs plain':>9} "
+              f"{'304s':>5} {'conns':>5} {'ms/call':>8}")
+        baseline = None
+        for label, accept_encoding, conditional in modes:
+            m = run_mode(args.port, calls, accept_encoding, conditional)
+            total = m["sent"] + m["received"]
+            baseline = baseline or total
+            print(f"{label:<10} {m['sent'] / 1024:>9.1f} {m['received'] / 1024:>9.1f} "
+                  f"{total / 1024:>9.1f} {total / baseline:>8.0%} {m['not_modified']:>5} "
+                  f"{m['connections']:>5} {m['ms_per_call']:>8.2f}")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark per-worker memory with private vs memory-mapped taxonomies.
+
+Usage:
+    python benchmarks/bench_taxonomy_image_rss.py [--scale 100] [--workers 1 4 16]
+
+Builds an olog with every table section scaled ``--scale`` times, then for
+each worker count starts that many server processes, once parsing the YAML
+privately and once mapping a shared compiled image (COCKPIT_TAXONOMY_IMAGE).
+Each worker sweeps the whole taxonomy (every instrument, and every aircraft
+type in every era) before memory is read from /proc/<pid>/smaps_rollup
+(Linux only), so the figures include everything a long-running worker ends
+up materializing.
+
+RSS counts shared mapped pages in every worker; PSS splits them between the
+workers mapping them; USS is memory private to the worker.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+OLOG = ROOT / "src" / "cockpit_design_aesthetics" / "ologs" / "instruments.yaml"
+
+WORKER = """
+import sys
+from cockpit_design_aesthetics import server
+
+options = server.list_available_options_impl()
+for name in options['instruments']:
+    server.get_instrument_details_impl(name)
+for aircraft in options['aircraft_types']:
+    for era in options['eras']:
+        server.build_panel_specification_impl(aircraft, era, None, 'comprehensive')
+        server.render_cockpit_prompt_impl(aircraft, era)
+print("ready", flush=True)
+sys.stdin.read()
+"""
+
+SCALED_SECTIONS = ('positioning', 'scan_patterns', 'color_standards', 'aircraft_types', 'eras')
+
+
+def _scaled(entries: dict, scale: int) -> dict:
+    out = dict(entries)
+    for copy in range(1, scale):
+        for key, value in entries.items():
+            out[f"{key}_x{copy}"] = value
+    return out
+
+
+def write_scaled_olog(path: Path, scale: int) -> None:
+    taxonomy = yaml.safe_load(OLOG.read_text())
+    taxonomy['instruments'] = {
+        category: _scaled(insts, scale) for category, insts in taxonomy['instruments'].items()
+    }
+    for section in SCALED_SECTIONS:
+        taxonomy[section] = _scaled(taxonomy[section], scale)
+    # No YAML anchors: every copy is a separate object when parsed
+    yaml.Dumper.ignore_aliases = lambda self, data: True
+    path.write_text(yaml.dump(taxonomy, sort_keys=False))
+
+
+def read_memory(pid: int) -> dict:
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        key, value = line.split(":", 1)
+        fields[key] = int(value.split()[0])  # kB
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def run(workers: int, env: dict) -> dict:
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER], env=env, cwd=ROOT,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(workers)
+    ]
+    try:
+        for proc in procs:
+            if proc.stdout.readline().strip() != "ready":
+                raise RuntimeError("worker failed to start")
+        samples = [read_memory(proc.pid) for proc in procs]
+    finally:
+        for proc in procs:
+            proc.stdin.close()
+            proc.wait()
+    return {
+        key: sum(sample[key] for sample in samples) / workers / 1024
+        for key in ("rss", "pss", "uss")
+    } | {"total_pss": sum(sample["pss"] for sample in samples) / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        olog = Path(tmp) / "instruments_scaled.yaml"
+        image = Path(tmp) / "taxonomy.img"
+        write_scaled_olog(olog, args.scale)
+
+        base = {**os.environ, "COCKPIT_OLOG_PATH": str(olog), "PYTHONPATH": str(ROOT / "src")}
+        base.pop("COCKPIT_TAXONOMY_IMAGE", None)
+
+        # Compile the shared image once up front, as the first worker would
+        from cockpit_design_aesthetics.server import IMAGE_BUILD_ID, _compile_indexes
+        from cockpit_design_aesthetics.taxonomy_image import ensure_image
+        ensure_image(olog, image, _compile_indexes, IMAGE_BUILD_ID)
+
+        print(f"olog: {olog.stat().st_size / 1e6:.1f} MB YAML, "
+              f"image: {image.stat().st_size / 1e6:.1f} MB (scale {args.scale}x)")
+        print(f"{'mode':<8} {'workers':>7} {'RSS/worker':>11} {'PSS/worker':>11} "
+              f"{'USS/worker':>11} {'total PSS':>10}   (MB)")
+        for mode, env in (("private", base), ("mmap", {**base, "COCKPIT_TAXONOMY_IMAGE": str(image)})):
+            for workers in args.workers:
+                m = run(workers, env)
+                print(f"{mode:<8} {workers:>7} {m['rss']:>11.1f} {m['pss']:>11.1f} "
+                      f"{m['uss']:>11.1f} {m['total_pss']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
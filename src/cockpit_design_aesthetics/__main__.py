@@ -3,12 +3,31 @@ Local execution script for Cockpit Design Aesthetics MCP server.
 
 Usage:
     python -m cockpit_design_aesthetics
+    python -m cockpit_design_aesthetics --http [--host 0.0.0.0] [--port 8000]
 
-This runs the server locally for testing and development.
+This runs the server locally for testing and development. With --http it
+serves Streamable HTTP (see handler.http_app) and keeps idle client
+connections open for --keep-alive seconds so agents can reuse them.
 For production, use FastMCP Cloud deployment.
 """
 
+import argparse
+
 from .server import mcp
 
 if __name__ == "__main__":
-    mcp.run()
+    parser = argparse.ArgumentParser(description="Cockpit Design Aesthetics MCP server")
+    parser.add_argument("--http", action="store_true", help="serve Streamable HTTP instead of stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--keep-alive", type=int, default=75, help="idle connection timeout (seconds)")
+    args = parser.parse_args()
+
+    if args.http:
+        import uvicorn
+
+        from .handler import http_app
+
+        uvicorn.run(http_app(), host=args.host, port=args.port, timeout_keep_alive=args.keep_alive)
+    else:
+        mcp.run()
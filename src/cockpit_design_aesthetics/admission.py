@@ -0,0 +1,204 @@
+"""
+Admission control and priority-aware load shedding for tool dispatch.
+
+Under a burst, cheap lookups (``get_instrument_details``) would otherwise
+queue behind expensive generation calls in the same worker-thread pool, and
+every tool's latency degrades together. ``AdmissionMiddleware`` gates each
+``tools/call`` on the event loop, before a worker thread is taken:
+
+- a global cap on calls running at once (keep it below AnyIO's thread pool
+  size so admitted calls never wait for a thread);
+- optional per-tool caps, so one bulk tool cannot take every slot;
+- priority classes: when a slot frees, the most urgent class with an
+  eligible waiter goes first, FIFO within a class;
+- bounded per-class queues; a call arriving at a full queue is rejected at
+  once, and a queued call not admitted within its class's ``max_wait`` is
+  rejected at its deadline. Both raise :class:`OverloadedError`, a JSON-RPC
+  error carrying the reason and a retry hint, rather than a tool result.
+
+Tools without a class are not managed, so stats and admin tools keep
+answering while the server sheds load.
+"""
+
+import asyncio
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+from fastmcp.server.middleware import Middleware
+from mcp import MCPError
+
+
+@dataclass(frozen=True)
+class PriorityClass:
+    """Scheduling policy shared by every tool in a class."""
+
+    priority: int  # lower runs first
+    max_queue: int
+    max_wait: float  # seconds a call may wait for a slot
+
+
+DEFAULT_CLASSES = {
+    "interactive": PriorityClass(priority=0, max_queue=256, max_wait=2.0),
+    "bulk": PriorityClass(priority=1, max_queue=64, max_wait=10.0),
+}
+
+
+class OverloadedError(MCPError):
+    """Raised when a call is shed instead of being admitted."""
+
+    def __init__(self, tool: str, reason: str, retry_after: float):
+        detail = "queue is full" if reason == "queue_full" else "waited past its deadline"
+        super().__init__(
+            code=-32000,
+            message=f"Server overloaded: '{tool}' {detail}, retry after {retry_after:g}s",
+            data={"tool": tool, "reason": reason, "retry_after_seconds": retry_after},
+        )
+        self.reason = reason
+
+
+class _Waiter:
+    __slots__ = ("tool", "future", "enqueued")
+
+    def __init__(self, tool: str, future: asyncio.Future):
+        self.tool = tool
+        self.future = future
+        self.enqueued = time.monotonic()
+
+
+class AdmissionController:
+    """Per-tool concurrency limits and prioritized, bounded admission queues."""
+
+    def __init__(
+        self,
+        tool_classes: dict,
+        max_concurrent: int = 32,
+        tool_limits: Optional[dict] = None,
+        classes: Optional[dict] = None,
+    ):
+        self.tool_classes = dict(tool_classes)
+        self.max_concurrent = max_concurrent
+        self.tool_limits = dict(tool_limits or {})
+        self.classes = dict(classes or DEFAULT_CLASSES)
+        # Scan order for handing out freed slots
+        self._order = sorted(self.classes, key=lambda name: self.classes[name].priority)
+        self._queues = {name: deque() for name in self.classes}
+        self._running = Counter()
+        self._total_running = 0
+        self._admitted = Counter()
+        self._shed = Counter()  # (class, reason)
+        self._shed_by_tool = Counter()
+        self._peak_depth = Counter()
+        self._wait_total = Counter()
+
+    def _has_capacity(self, tool: str) -> bool:
+        if self._total_running >= self.max_concurrent:
+            return False
+        limit = self.tool_limits.get(tool)
+        return limit is None or self._running[tool] < limit
+
+    def _start(self, tool: str, class_name: str, waited: float) -> None:
+        self._total_running += 1
+        self._running[tool] += 1
+        self._admitted[class_name] += 1
+        self._wait_total[class_name] += waited
+
+    def _dispatch(self) -> None:
+        """Hand freed slots to the most urgent eligible waiters."""
+        for class_name in self._order:
+            queue = self._queues[class_name]
+            for waiter in list(queue):
+                if self._total_running >= self.max_concurrent:
+                    return
+                if waiter.future.done() or not self._has_capacity(waiter.tool):
+                    continue
+                queue.remove(waiter)
+                self._start(waiter.tool, class_name, time.monotonic() - waiter.enqueued)
+                waiter.future.set_result(True)
+
+    def _release(self, tool: str) -> None:
+        self._total_running -= 1
+        self._running[tool] -= 1
+        self._dispatch()
+
+    def _reject(self, tool: str, class_name: str, reason: str) -> OverloadedError:
+        self._shed[class_name, reason] += 1
+        self._shed_by_tool[tool] += 1
+        return OverloadedError(tool, reason, self.classes[class_name].max_wait)
+
+    @asynccontextmanager
+    async def admit(self, tool: str):
+        """Hold a slot for ``tool`` for the duration of the block."""
+        class_name = self.tool_classes.get(tool)
+        if class_name is None:
+            yield
+            return
+
+        policy = self.classes[class_name]
+        queue = self._queues[class_name]
+        # Freed slots are handed out eagerly, so anyone still queued is blocked
+        # by the global cap or their own tool's cap; neither blocks this call
+        # when it has capacity now.
+        if self._has_capacity(tool):
+            self._start(tool, class_name, 0.0)
+        else:
+            if len(queue) >= policy.max_queue:
+                raise self._reject(tool, class_name, "queue_full")
+            waiter = _Waiter(tool, asyncio.get_running_loop().create_future())
+            queue.append(waiter)
+            self._peak_depth[class_name] = max(self._peak_depth[class_name], len(queue))
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), policy.max_wait)
+            except asyncio.TimeoutError:
+                # A slot granted in the same loop iteration as the deadline still counts
+                if not waiter.future.done():
+                    queue.remove(waiter)
+                    waiter.future.cancel()
+                    raise self._reject(tool, class_name, "deadline") from None
+            except BaseException:
+                # Cancelled by the caller: give back a slot granted meanwhile
+                if waiter.future.done() and not waiter.future.cancelled():
+                    self._release(tool)
+                else:
+                    queue.remove(waiter)
+                    waiter.future.cancel()
+                raise
+
+        try:
+            yield
+        finally:
+            self._release(tool)
+
+    def stats(self) -> dict:
+        classes = {}
+        for name in self._order:
+            admitted = self._admitted[name]
+            classes[name] = {
+                "queue_depth": len(self._queues[name]),
+                "peak_queue_depth": self._peak_depth[name],
+                "max_queue": self.classes[name].max_queue,
+                "admitted": admitted,
+                "shed_queue_full": self._shed[name, "queue_full"],
+                "shed_deadline": self._shed[name, "deadline"],
+                "avg_wait_ms": round(self._wait_total[name] * 1000 / admitted, 3) if admitted else 0.0,
+            }
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self._total_running,
+            "running_by_tool": {tool: n for tool, n in self._running.items() if n},
+            "classes": classes,
+            "shed_by_tool": dict(self._shed_by_tool),
+        }
+
+
+class AdmissionMiddleware(Middleware):
+    """FastMCP middleware routing every tool call through an AdmissionController."""
+
+    def __init__(self, controller: AdmissionController):
+        self.controller = controller
+
+    async def on_call_tool(self, context, call_next):
+        async with self.controller.admit(context.message.name):
+            return await call_next(context)
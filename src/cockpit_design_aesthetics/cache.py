@@ -0,0 +1,221 @@
+"""
+Dependency-tracked result cache for the composition layers.
+
+Layer 1 lookups record which taxonomy nodes they read (an aircraft type, an
+era, a single instrument, the whole color_standards section, ...). Layer 2/3
+results cached here keep that set of nodes, so when the olog is reloaded a
+structural diff of old vs new taxonomy invalidates only the entries that
+actually read something that changed.
+
+Taxonomy nodes are tuples: ``('instruments', 'altimeter')``,
+``('eras', 'glass_cockpit')``, ``('color_standards',)``. A dependency on a
+section covers every node inside it.
+"""
+
+import functools
+import inspect
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from .profiling import deep_sizeof
+
+_MISSING = object()
+
+# Active dependency set for the call being computed (None = not recording)
+_recorder: ContextVar[Optional[set]] = ContextVar("taxonomy_dependency_recorder", default=None)
+
+
+def record_dependency(*path: str) -> None:
+    """Note that the current computation read the taxonomy node at ``path``."""
+    deps = _recorder.get()
+    if deps is not None:
+        deps.add(path)
+
+
+def collect_dependencies(func: Callable, *args, **kwargs) -> tuple:
+    """Call ``func`` and return ``(value, deps)``, the taxonomy nodes it read."""
+    deps = set()
+    token = _recorder.set(deps)
+    try:
+        value = func(*args, **kwargs)
+    finally:
+        _recorder.reset(token)
+    return value, frozenset(deps)
+
+
+def taxonomy_nodes(taxonomy: dict) -> dict:
+    """Flatten a taxonomy into ``{node_path: value}`` at dependency granularity.
+
+    Instruments are keyed by name regardless of category, so moving an
+    instrument between categories is not a change.
+    """
+    nodes = {}
+    for section, body in taxonomy.items():
+        if section == 'instruments' and isinstance(body, Mapping):
+            for insts in body.values():
+                for name, inst in (insts or {}).items():
+                    nodes[('instruments', name)] = inst
+        elif isinstance(body, Mapping):
+            for key, value in body.items():
+                nodes[(section, key)] = value
+        else:
+            nodes[(section,)] = body
+    return nodes
+
+
+def diff_taxonomy(old: dict, new: dict) -> set:
+    """Return the set of node paths added, removed or modified between taxonomies."""
+    old_nodes = taxonomy_nodes(old)
+    new_nodes = taxonomy_nodes(new)
+    return {
+        path for path in old_nodes.keys() | new_nodes.keys()
+        if old_nodes.get(path, _MISSING) != new_nodes.get(path, _MISSING)
+    }
+
+
+def _is_affected(dep: tuple, changed: set, changed_prefixes: set) -> bool:
+    """A dependency is stale if it, an ancestor, or a descendant changed."""
+    if dep in changed_prefixes:
+        return True
+    return any(dep[:i] in changed for i in range(1, len(dep)))
+
+
+class DependencyCache:
+    """LRU result cache whose entries are invalidated by taxonomy node."""
+
+    def __init__(self, maxsize: int = 1024, history: int = 20):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()   # key -> (value, deps)
+        self._by_dep = {}               # dep -> set of keys
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+        self.reloads = deque(maxlen=history)
+        # Bumped by every invalidation, so results computed across one are dropped
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        """Return ``(value, deps)`` or ``None`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, value, deps: frozenset, generation: Optional[int] = None) -> None:
+        """Store an entry; with ``generation``, only if no invalidation ran since."""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                self.discarded += 1
+                return
+            if key in self._entries:
+                self._unlink(key)
+            self._entries[key] = (value, deps)
+            for dep in deps:
+                self._by_dep.setdefault(dep, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._unlink(next(iter(self._entries)))
+
+    def _unlink(self, key) -> None:
+        _, deps = self._entries.pop(key)
+        for dep in deps:
+            keys = self._by_dep.get(dep)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_dep[dep]
+
+    def invalidate(self, changed: set) -> dict:
+        """Drop entries depending on any changed node and record reload metrics."""
+        changed_prefixes = {path[:i] for path in changed for i in range(1, len(path) + 1)}
+        with self._lock:
+            before = len(self._entries)
+            stale = set()
+            for dep, keys in self._by_dep.items():
+                if _is_affected(dep, changed, changed_prefixes):
+                    stale.update(keys)
+            for key in stale:
+                self._unlink(key)
+            if changed:
+                self.generation += 1
+            metrics = {
+                "changed_nodes": sorted('.'.join(path) for path in changed),
+                "entries_before": before,
+                "invalidated": len(stale),
+                "survived": before - len(stale)
+            }
+            self.reloads.append(metrics)
+            return metrics
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_dep.clear()
+            self.generation += 1
+
+    def footprint(self, exclude: Optional[set] = None) -> int:
+        """Approximate bytes held by entries and the dependency index."""
+        with self._lock:
+            return deep_sizeof((self._entries, self._by_dep), exclude)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "discarded_after_reload": self.discarded,
+                "tracked_dependencies": len(self._by_dep),
+                "reloads": list(self.reloads)
+            }
+
+
+def cached(cache: DependencyCache) -> Callable:
+    """Cache a composition function, recording the taxonomy nodes it reads.
+
+    Cached results are shared between callers and must be treated as
+    read-only. Dependencies of a cached inner call propagate to any outer
+    cached call, so a Layer 3 entry is invalidated by its Layer 2 inputs.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (func.__name__, tuple(bound.arguments.values()))
+            outer = _recorder.get()
+
+            entry = cache.get(key)
+            if entry is not None:
+                value, deps = entry
+            else:
+                # A reload landing mid-call has already run its invalidation,
+                # so a result computed across it must not be stored.
+                generation = cache.generation
+                value, deps = collect_dependencies(func, *args, **kwargs)
+                # Error results are cheap to recompute and depend on the
+                # absence of nodes, so they are not cached.
+                if not (isinstance(value, dict) and "error" in value):
+                    cache.put(key, value, deps, generation)
+
+            if outer is not None:
+                outer.update(deps)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
@@ -3,10 +3,32 @@ FastMCP Cloud entry point for Cockpit Design Aesthetics server.
 
 For FastMCP Cloud deployment, the entry point function must RETURN the server object.
 The cloud platform handles the event loop and server.run() call.
+
+For self-hosted HTTP serving, http_app() wraps the same server in a
+Streamable HTTP ASGI app with ETag revalidation and response compression.
 """
 
+from starlette.middleware import Middleware
+
+from . import server
+from .http_transport import ConditionalResponseMiddleware
 from .server import mcp
 
 def handler():
     """Entry point for FastMCP Cloud deployment."""
     return mcp
+
+def http_app(path: str = "/mcp", min_compress_size: int = 1024):
+    """ASGI app serving handler() over stateless Streamable HTTP with JSON responses."""
+    return handler().http_app(
+        path=path,
+        stateless_http=True,
+        json_response=True,
+        middleware=[Middleware(
+            ConditionalResponseMiddleware,
+            # Read at request time: reload_taxonomy() changes the hash
+            taxonomy_hash=lambda: server.TAXONOMY_HASH,
+            deterministic_tools=server.DETERMINISTIC_TOOLS,
+            min_size=min_compress_size,
+        )],
+    )
@@ -0,0 +1,201 @@
+"""
+Conditional and compressed responses for the Streamable HTTP transport.
+
+Remote agents call static tools such as ``list_available_options`` over and
+over, and get a byte-identical payload every time. This ASGI middleware sits
+in front of FastMCP's Streamable HTTP app (stateless, JSON responses) and:
+
+- stamps ``tools/call`` responses of deterministic tools with a weak ETag
+  derived from the package version, the taxonomy content hash, the tool
+  name and its arguments;
+- answers a request whose ``If-None-Match`` carries that ETag with a bodiless
+  ``304 Not Modified`` without dispatching the tool at all. The client reuses
+  the result it already holds, swapping in its new JSON-RPC ``id``;
+- compresses JSON bodies above ``min_size`` bytes with zstd (when the
+  optional ``zstandard`` package is installed) or gzip, following the
+  request's ``Accept-Encoding``.
+
+The ETag identifies the tool result, not the bytes of one response (those
+embed the JSON-RPC id and the content encoding), hence weak. Reloading the
+olog changes the taxonomy hash and with it every ETag, and so does deploying
+a new package version, whose code may render results differently. Streaming (SSE)
+responses and other routes pass through untouched.
+"""
+
+import gzip
+import hashlib
+import json
+from typing import Callable, Iterable, Optional
+
+from . import __version__
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip is always available
+    zstandard = None
+
+
+def _encoders() -> dict:
+    encoders = {"gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0)}
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=3)
+        encoders["zstd"] = compressor.compress
+    return encoders
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Map each coding in an ``Accept-Encoding`` header to its q-value."""
+    codings = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding.strip().lower()] = q
+    return codings
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison (RFC 9110 13.1.2) against an ``If-None-Match`` list."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+class ConditionalResponseMiddleware:
+    """ETag/304 revalidation and response compression for MCP over HTTP."""
+
+    def __init__(
+        self,
+        app,
+        taxonomy_hash: Callable[[], str],
+        deterministic_tools: Iterable[str],
+        min_size: int = 1024,
+        encodings: Optional[Iterable[str]] = None,
+        version: str = __version__,
+    ):
+        self.app = app
+        self.taxonomy_hash = taxonomy_hash
+        self.version = version
+        self.deterministic_tools = frozenset(deterministic_tools)
+        self.min_size = min_size
+        encoders = _encoders()
+        preferred = encodings if encodings is not None else ("zstd", "gzip")
+        # Server preference order breaks ties between equal q-values
+        self.encoders = {name: encoders[name] for name in preferred if name in encoders}
+
+    def etag_for(self, body: bytes) -> Optional[str]:
+        """Weak ETag for a deterministic ``tools/call`` request body, else None."""
+        try:
+            message = json.loads(body)
+        except ValueError:
+            return None
+        if not isinstance(message, dict) or message.get("method") != "tools/call":
+            return None
+        params = message.get("params") or {}
+        name = params.get("name")
+        if name not in self.deterministic_tools:
+            return None
+        arguments = json.dumps(params.get("arguments") or {}, sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha256(f"{self.version}\0{self.taxonomy_hash()}\0{name}\0{arguments}".encode()).hexdigest()
+        return f'W/"{digest[:32]}"'
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        accepted = parse_accept_encoding(accept_encoding)
+        best, best_q = None, 0.0
+        for name in self.encoders:
+            q = accepted.get(name, accepted.get("*", 0.0))
+            if q > best_q:
+                best, best_q = name, q
+        return best
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+
+        # Buffer the (small) JSON-RPC request so it can be inspected, then replay it
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        etag = self.etag_for(body)
+        if etag is not None and _etag_matches(headers.get("if-none-match", ""), etag):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", etag.encode()), (b"vary", b"accept-encoding")],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        encoding = self.choose_encoding(headers.get("accept-encoding", ""))
+        start = None
+        buffered = []
+
+        async def wrapped_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                if content_type.startswith(b"application/json"):
+                    start = message
+                    return
+            elif message["type"] == "http.response.body" and start is not None:
+                buffered.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                await self._send_buffered(send, start, b"".join(buffered), etag, encoding)
+                return
+            await send(message)
+
+        await self.app(scope, replay, wrapped_send)
+
+    async def _send_buffered(self, send, start, body: bytes, etag, encoding) -> None:
+        headers = [
+            (key, value) for key, value in start.get("headers", [])
+            if key.lower() not in (b"content-length", b"etag")
+        ]
+        if etag is not None and start["status"] == 200 and _is_success(body):
+            headers.append((b"etag", etag.encode()))
+        if self.encoders:
+            headers.append((b"vary", b"accept-encoding"))
+        if encoding is not None and len(body) >= self.min_size:
+            body = self.encoders[encoding](body)
+            headers.append((b"content-encoding", encoding.encode()))
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({**start, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def _is_success(body: bytes) -> bool:
+    """Only successful tool results are safe to revalidate later."""
+    try:
+        message = json.loads(body)
+    except ValueError:
+        return False
+    result = message.get("result") if isinstance(message, dict) else None
+    return isinstance(result, dict) and not result.get("isError", False)
@@ -0,0 +1,204 @@
+"""
+On-demand profiling and memory-footprint helpers for admin tools.
+
+The profiler works by temporarily replacing ``*_impl`` functions in a
+module's globals with profiled wrappers. The ``@mcp.tool()`` functions look
+their implementation up by name on every call, so while a session is active
+every dispatch is profiled, and once it has seen N top-level calls the
+original functions are put back. With no session active nothing is wrapped
+and tool dispatch runs exactly the code it always does.
+
+Sync tools run in worker threads, but only one top-level call is
+profiled at a time: from Python 3.12 cProfile hooks the interpreter-wide
+``sys.monitoring``, and a second concurrent profiler fails to enable. Calls
+that arrive while another is being profiled, or while some other tool owns
+the profiling hook, run unprofiled and are counted as skipped; they never
+fail. Per-call results are merged.
+"""
+
+import cProfile
+import functools
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from typing import Callable, Iterable, Optional
+
+
+class ToolProfiler:
+    """Profile the next N tool calls dispatched through a module's impls."""
+
+    def __init__(self, namespace: dict):
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        self._profiling = threading.Lock()  # held by the one call being profiled
+        self._local = threading.local()
+        self._originals = {}
+        self._stats: Optional[pstats.Stats] = None
+        self._remaining = 0
+        self._requested = 0
+        self._completed = 0
+        self._skipped = 0
+
+    @property
+    def active(self) -> bool:
+        return bool(self._originals)
+
+    def start(self, names: Iterable[str], n_calls: int) -> dict:
+        """Wrap ``names`` in the namespace and profile the next ``n_calls`` calls."""
+        if n_calls < 1:
+            return {"error": "n_calls must be at least 1"}
+        with self._lock:
+            if self._originals:
+                return {"error": "Profiling session already active", "remaining_calls": self._remaining}
+            self._stats = None
+            self._remaining = self._requested = n_calls
+            self._completed = self._skipped = 0
+            for name in names:
+                original = self._namespace[name]
+                self._originals[name] = original
+                self._namespace[name] = self._wrap(original)
+            return {"profiling": True, "n_calls": n_calls, "wrapped": sorted(self._originals)}
+
+    def stop(self) -> None:
+        """Restore the original functions (idempotent)."""
+        with self._lock:
+            self._restore()
+
+    def _restore(self) -> None:
+        for name, original in self._originals.items():
+            self._namespace[name] = original
+        self._originals = {}
+        self._remaining = 0
+
+    def _wrap(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Nested impl calls are already inside the outer call's profile
+            if getattr(self._local, "depth", 0):
+                return func(*args, **kwargs)
+            if not self._profiling.acquire(blocking=False):
+                self._skip()
+                return func(*args, **kwargs)
+            try:
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Another profiler (debugger, coverage, ...) owns the hook
+                    self._skip()
+                    return func(*args, **kwargs)
+                self._local.depth = 1
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    profile.disable()
+                    self._local.depth = 0
+                    self._collect(profile)
+            finally:
+                self._profiling.release()
+
+        return wrapper
+
+    def _skip(self) -> None:
+        with self._lock:
+            self._skipped += 1
+
+    def _collect(self, profile: cProfile.Profile) -> None:
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self._completed += 1
+            if self._remaining:
+                self._remaining -= 1
+                if not self._remaining:
+                    self._restore()
+
+    def report(self, top: int = 20, sort: str = "cumulative") -> dict:
+        """Return the hottest functions seen so far in the current/last session."""
+        with self._lock:
+            summary = {
+                "active": self.active,
+                "requested_calls": self._requested,
+                "profiled_calls": self._completed,
+                "skipped_calls": self._skipped,
+                "remaining_calls": self._remaining,
+            }
+            if self._stats is None:
+                return {**summary, "functions": []}
+            rows = []
+            for (filename, line, func), (cc, nc, tt, ct, _) in self._stats.stats.items():
+                rows.append({
+                    "function": f"{os.path.basename(filename)}:{line}({func})",
+                    "calls": nc,
+                    "total_time_ms": round(tt * 1000, 4),
+                    "cumulative_time_ms": round(ct * 1000, 4),
+                })
+        key = "total_time_ms" if sort == "tottime" else "cumulative_time_ms"
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return {**summary, "sort": key, "functions": rows[:top]}
+
+
+def traced_size(factory: Callable[[], object]) -> int:
+    """Bytes still allocated after building an object with ``factory``.
+
+    Uses tracemalloc, starting it for the measurement if it isn't already
+    running. Objects the factory reuses rather than allocates (interned
+    strings, shared sub-structures) are not counted.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = factory()
+        after, _ = tracemalloc.get_traced_memory()
+        del result
+        return max(after - before, 0)
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def deep_sizeof(obj: object, exclude: Optional[set] = None) -> int:
+    """Recursive ``sys.getsizeof`` over containers, counting each object once.
+
+    Objects whose ``id`` is in ``exclude`` (and everything only reachable
+    through them) are skipped, so a cache can be measured without counting
+    the taxonomy objects its entries point into.
+    """
+    seen = set(exclude or ())
+    stack = [obj]
+    total = 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+    return total
+
+
+def reachable_ids(obj: object) -> set:
+    """Ids of every object reachable from ``obj`` through containers."""
+    ids = set()
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in ids:
+            continue
+        ids.add(id(current))
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+    return ids
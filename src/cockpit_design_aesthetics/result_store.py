@@ -0,0 +1,385 @@
+"""
+Persistent result store shared by every process on a host.
+
+``RESULT_CACHE`` is per process, so each fresh instance recomputes the same
+Layer 2/3 results. With ``COCKPIT_RESULT_STORE=/path/results.sqlite`` the
+``@persisted`` compositions also read and write a SQLite file:
+
+- the key is a hash of the function, its bound arguments (defaults filled
+  in), the taxonomy content hash and the code version (package version
+  plus ``STORE_VERSION``), so neither an edited olog nor a redeploy serves
+  old results; entries for a previous taxonomy or release simply age out;
+- each entry keeps the taxonomy nodes the result read, and a hit replays
+  them into the enclosing ``@cached`` call so reload invalidation still works;
+- the database runs in WAL mode with a busy timeout, so concurrent readers
+  and writers in several processes do not block each other for long. Each
+  thread gets its own connection, reopened after a fork;
+- the store is bounded by ``max_bytes``. A write that takes it over the
+  bound evicts least recently used entries down to 90% of it. Reads bump
+  ``last_access`` at most once per ``touch_interval``, so hot entries are
+  not rewritten on every hit. The bump never waits for the write lock: if
+  another connection holds it, the bump is skipped;
+- a database error is counted and treated as a miss. The store can slow a
+  call down, but never fail it.
+
+Values are pickled (taxonomy image proxies are converted to plain
+containers first), so results come back exactly as computed. The file is a
+trusted local cache: keep it where only the service can write.
+
+Warm-up::
+
+    python -m cockpit_design_aesthetics.result_store warm results.sqlite \\
+        [--recording traffic.jsonl ...] [--grid]
+
+replays the persisted tools' calls from traffic recordings (see
+``traffic.py``), and/or every aircraft type x era with default options,
+through an in-process server, so new instances start with a full store.
+"""
+
+import argparse
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from typing import Callable, Optional
+
+from . import __version__
+from .cache import collect_dependencies, record_dependency
+from .taxonomy_image import ImageDict, ImageList
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    function TEXT NOT NULL,
+    taxonomy_hash TEXT NOT NULL,
+    value BLOB NOT NULL,
+    deps TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_by_access ON results(last_access);
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    total_bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO usage VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS results_added AFTER INSERT ON results BEGIN
+    UPDATE usage SET total_bytes = total_bytes + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS results_removed AFTER DELETE ON results BEGIN
+    UPDATE usage SET total_bytes = total_bytes - OLD.size;
+END;
+CREATE TRIGGER IF NOT EXISTS results_resized AFTER UPDATE OF size ON results BEGIN
+    UPDATE usage SET total_bytes = total_bytes - OLD.size + NEW.size;
+END;
+"""
+
+_EVICT_BATCH = 64
+
+# Bump when a persisted function's output changes for the same olog and
+# arguments without a package version bump
+STORE_VERSION = 1
+
+
+def result_key(function: str, arguments: dict, taxonomy_hash: str) -> str:
+    """Content hash identifying one call against one taxonomy and code version."""
+    body = json.dumps([STORE_VERSION, __version__, function, taxonomy_hash, arguments],
+                      sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _plain(value):
+    """Deep copy of ``value`` with taxonomy image proxies as dicts and lists."""
+    if isinstance(value, (ImageDict, ImageList)):
+        return value.to_python()
+    if isinstance(value, Mapping):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+class ResultStore:
+    """Size-bounded LRU key/value store in a SQLite file shared across processes."""
+
+    def __init__(
+        self,
+        path,
+        max_bytes: int = 256 * 1024 * 1024,
+        touch_interval: float = 60.0,
+        busy_timeout: float = 5.0,
+    ):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+        self._connection()  # create the schema now, so a bad path fails at startup
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        # Autocommit; writes take an explicit IMMEDIATE transaction
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        self._local.conn, self._local.pid = conn, os.getpid()
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def _count(self, counter: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def get(self, key: str):
+        """Return ``(value, deps)`` or ``None`` on a miss."""
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, deps, last_access FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            value, deps, last_access = row
+            value = pickle.loads(value)
+        except (sqlite3.Error, pickle.UnpicklingError):
+            self._count("errors")
+            return None
+        self._count("hits")
+        now = time.time()
+        if now - last_access > self.touch_interval:
+            # Fail at once instead of waiting out busy_timeout behind a writer
+            conn.execute("PRAGMA busy_timeout = 0")
+            try:
+                conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+            except sqlite3.Error:
+                pass  # skipped; the entry just looks older to eviction
+            finally:
+                conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        return value, frozenset(tuple(dep) for dep in json.loads(deps))
+
+    def put(self, key: str, function: str, taxonomy_hash: str, value, deps: frozenset) -> bool:
+        """Store a result, evicting old entries if the store grows past ``max_bytes``."""
+        blob = pickle.dumps(_plain(value), protocol=pickle.HIGHEST_PROTOCOL)
+        dep_list = json.dumps(sorted(deps))
+        size = len(key) + len(function) + len(taxonomy_hash) + len(blob) + len(dep_list)
+        if size > self.max_bytes:
+            return False
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                    "value = excluded.value, deps = excluded.deps, size = excluded.size, "
+                    "last_access = excluded.last_access",
+                    (key, function, taxonomy_hash, blob, dep_list, size, time.time()),
+                )
+                evicted = self._evict(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            self._count("errors")
+            return False
+        self._count("writes")
+        self._count("evictions", evicted)
+        return True
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """Drop least recently used entries until under 90% of ``max_bytes``."""
+        (total,) = conn.execute("SELECT total_bytes FROM usage").fetchone()
+        if total <= self.max_bytes:
+            return 0
+        low_water = int(self.max_bytes * 0.9)
+        evicted = 0
+        while total > low_water:
+            cursor = conn.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY last_access LIMIT ?)", (_EVICT_BATCH,)
+            )
+            if cursor.rowcount <= 0:
+                break
+            evicted += cursor.rowcount
+            (total,) = conn.execute("SELECT total_bytes FROM usage").fetchone()
+        return evicted
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM results")
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def stats(self, taxonomy_hash: Optional[str] = None) -> dict:
+        conn = self._connection()
+        entries, current = conn.execute(
+            "SELECT count(*), total(taxonomy_hash = ?) FROM results", (taxonomy_hash,)
+        ).fetchone()
+        (total,) = conn.execute("SELECT total_bytes FROM usage").fetchone()
+        with self._lock:
+            stats = {
+                "path": self.path,
+                "entries": entries,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "errors": self.errors,
+            }
+        if taxonomy_hash is not None:
+            stats["current_taxonomy_entries"] = int(current)
+        return stats
+
+
+def persisted(store: Callable[[], Optional[ResultStore]], version: Callable[[], str]) -> Callable:
+    """Back a composition function with a persistent store.
+
+    ``store`` and ``version`` are called per call, so the store can be
+    enabled later and ``version`` (the taxonomy hash) follows reloads. With
+    no store the function is called directly. Apply below ``@cached`` so the
+    in-process cache is checked first. Error results are not stored, nor
+    are results computed across a taxonomy reload, which may mix both
+    versions of the taxonomy under the old hash.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            target = store()
+            if target is None:
+                return func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            taxonomy_hash = version()
+            key = result_key(func.__name__, bound.arguments, taxonomy_hash)
+
+            entry = target.get(key)
+            if entry is not None:
+                value, deps = entry
+            else:
+                value, deps = collect_dependencies(func, *args, **kwargs)
+                failed = isinstance(value, dict) and "error" in value
+                if not failed and version() == taxonomy_hash:
+                    target.put(key, func.__name__, taxonomy_hash, value, deps)
+
+            for dep in deps:
+                record_dependency(*dep)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+# ============================================================================
+# Warm-up
+# ============================================================================
+
+def warm(calls, tools: dict) -> dict:
+    """Call ``tools[name](**arguments)`` once per distinct ``(name, arguments)``.
+
+    Calls to tools not in ``tools`` are skipped.
+    """
+    seen = set()
+    report = {"calls": 0, "skipped": 0, "errors": 0, "by_tool": {}}
+    start = time.perf_counter()
+    for name, arguments in calls:
+        if name not in tools:
+            report["skipped"] += 1
+            continue
+        signature = json.dumps([name, arguments], sort_keys=True, default=repr)
+        if signature in seen:
+            continue
+        seen.add(signature)
+        report["calls"] += 1
+        report["by_tool"][name] = report["by_tool"].get(name, 0) + 1
+        try:
+            result = tools[name](**arguments)
+        except TypeError:
+            result = {"error": "bad arguments"}
+        if isinstance(result, dict) and "error" in result:
+            report["errors"] += 1
+    report["duration_s"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def grid_calls(aircraft_types: list, eras: list) -> list:
+    """Default-option calls of the persisted tools for every aircraft type x era."""
+    calls = []
+    for aircraft_type in aircraft_types:
+        calls.append(("suggest_instruments", {"aircraft_type": aircraft_type}))
+        for era in eras:
+            calls.append(("suggest_instruments", {"aircraft_type": aircraft_type, "panel_era": era}))
+            calls.append(("build_panel_specification", {"aircraft_type": aircraft_type, "panel_era": era}))
+            calls.append(("generate_cockpit_prompt", {"aircraft_type": aircraft_type, "panel_era": era}))
+    return calls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the persistent result store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    warm_parser = commands.add_parser("warm", help="pre-fill the store by running calls in-process")
+    warm_parser.add_argument("store")
+    warm_parser.add_argument("--recording", action="append", default=[],
+                             help="traffic recording to replay (repeatable; rotated backups included)")
+    warm_parser.add_argument("--grid", action="store_true",
+                             help="every aircraft type x era with default options")
+    warm_parser.add_argument("--max-mb", type=int, default=256, help="store size bound")
+    stats_parser = commands.add_parser("stats", help="print store size and entry counts")
+    stats_parser.add_argument("store")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        report = ResultStore(args.store).stats()
+    else:
+        if not args.recording and not args.grid:
+            parser.error("warm needs --recording and/or --grid")
+        from . import server
+        from .traffic import read_recording
+
+        server.RESULT_STORE = ResultStore(args.store, max_bytes=args.max_mb * 1024 * 1024)
+
+        calls = []
+        for path in args.recording:
+            calls.extend((entry["tool"], entry["args"]) for entry in read_recording(path))
+        if args.grid:
+            options = server.list_available_options_impl()
+            calls.extend(grid_calls(options["aircraft_types"], options["eras"]))
+        report = warm(calls, {name: getattr(server, name) for name in server.PERSISTED_TOOLS})
+        report["store"] = server.RESULT_STORE.stats(server.TAXONOMY_HASH)
+
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    # Never append the warm-up itself to a recording
+    os.environ.pop("COCKPIT_TRAFFIC_LOG", None)
+    main()
@@ -0,0 +1,371 @@
+"""
+SVG schematics of instrument panel layouts.
+
+Each instrument is drawn once, from its olog ``color_scheme`` and
+``speed_arcs``, as an SVG ``<symbol>`` in unit coordinates (a round gauge or
+an electronic display). A panel is a layout of ``<use>`` references to those
+fragments plus zone frames and the T-scan highlight, so rendering a panel
+never redraws an instrument.
+
+Dial geometry: gauges sweep 270 degrees clockwise from 7:30 to 4:30; bands
+and lines sit at fixed fractions of that sweep (a schematic shows which
+ranges exist and their colours, not calibrated values).
+"""
+
+import hashlib
+import math
+from typing import Optional
+from xml.sax.saxutils import escape, quoteattr
+
+CELL = 110  # grid pitch of one gauge, including its margin
+PAD = 7
+MARGIN = 30
+LABEL_HEIGHT = 22
+SIDE_COLUMNS = 2
+
+PANEL_COLOR = "#2A2D30"
+ZONE_COLOR = "#3A3E42"
+LABEL_COLOR = "#C8CCD0"
+T_SCAN_COLOR = "#00BFFF"
+
+# Slots of the classic six-pack within the primary block (column, row)
+PRIMARY_SLOTS = {
+    "primary_left": (0, 0),
+    "primary_center": (1, 0),
+    "primary_right": (2, 0),
+    "primary_bottom_left": (0, 1),
+    "primary_bottom_center": (1, 1),
+    "primary_bottom_right": (2, 1),
+}
+T_SCAN_SLOTS = ("primary_left", "primary_center", "primary_right", "primary_bottom_center")
+
+SIDE_ZONES = ("engine_cluster", "navigation_cluster")
+BOTTOM_ZONE = "systems_cluster"
+
+# (kind, start, end) as fractions of the dial sweep; lines use start only
+SPEED_ARC_BANDS = {
+    "flap_operating": ("inner", 0.10, 0.45),
+    "normal_operating": ("band", 0.20, 0.70),
+    "caution": ("band", 0.70, 0.90),
+    "never_exceed": ("line", 0.90, 0.90),
+}
+SCHEME_ARC_BANDS = {
+    "green_arc": ("band", 0.25, 0.70),
+    "yellow_arc": ("band", 0.70, 0.90),
+    "warning_bands": ("band", 0.85, 1.00),
+    "red_line": ("line", 0.90, 0.90),
+}
+
+_SWEEP_START = -135.0
+_SWEEP = 270.0
+
+
+def _point(radius: float, fraction: float) -> tuple:
+    angle = math.radians(_SWEEP_START + _SWEEP * fraction)
+    return round(radius * math.sin(angle), 2), round(-radius * math.cos(angle), 2)
+
+
+def _arc(radius: float, start: float, end: float, color: str, width: float) -> str:
+    x1, y1 = _point(radius, start)
+    x2, y2 = _point(radius, end)
+    large = 1 if (end - start) * _SWEEP > 180 else 0
+    return (f'<path d="M {x1} {y1} A {radius} {radius} 0 {large} 1 {x2} {y2}" fill="none" '
+            f'stroke={quoteattr(color)} stroke-width="{width}"/>')
+
+
+def _radial(inner: float, outer: float, fraction: float, color: str, width: float) -> str:
+    x1, y1 = _point(inner, fraction)
+    x2, y2 = _point(outer, fraction)
+    return f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke={quoteattr(color)} stroke-width="{width}"/>'
+
+
+def _label(text: str, x: float, y: float, size: float, color: str, max_width: float) -> str:
+    fit = f' textLength="{max_width}" lengthAdjust="spacingAndGlyphs"' if len(text) * size * 0.55 > max_width else ""
+    return (f'<text x="{x}" y="{y}" text-anchor="middle" font-family="sans-serif" font-size="{size}" '
+            f'fill={quoteattr(color)}{fit}>{escape(text)}</text>')
+
+
+def _resolve_color(color: str, scheme: dict, palette: dict) -> str:
+    """Olog colours are hex, an ``<name>_arc`` scheme key, or a standard colour name."""
+    if color.startswith("#"):
+        return color
+    return scheme.get(f"{color}_arc") or palette.get(color, color)
+
+
+def _arc_marks(scheme: dict, speed_arcs: dict, palette: dict) -> list:
+    """(kind, start, end, color) for every arc and limit line an instrument shows."""
+    marks = []
+    if speed_arcs:
+        for band, color in speed_arcs.items():
+            if band in SPEED_ARC_BANDS:
+                kind, start, end = SPEED_ARC_BANDS[band]
+                marks.append((kind, start, end, _resolve_color(str(color), scheme, palette)))
+    else:
+        for key, (kind, start, end) in SCHEME_ARC_BANDS.items():
+            if key in scheme:
+                marks.append((kind, start, end, str(scheme[key])))
+    return marks
+
+
+def _ink(scheme: dict, *keys: str, default: str = "#000000") -> str:
+    for key in keys:
+        if key in scheme:
+            return str(scheme[key])
+    return default
+
+
+def gauge_fragment(name: str, inst: dict, palette: dict) -> str:
+    """Round gauge ``<symbol>`` in a -50..50 box."""
+    scheme = dict(inst.get("color_scheme") or {})
+    face = _ink(scheme, "background", default="#FFFFFF")
+    ink = _ink(scheme, "numbers", "needles", "needle", "indicators", "aircraft")
+    parts = [
+        '<circle r="48" fill="#111111"/>',
+        f'<circle r="44" fill={quoteattr(face)} stroke="#777777" stroke-width="1.5"/>',
+    ]
+    if "sky" in scheme and "earth" in scheme:
+        parts += [
+            f'<path d="M -44 0 A 44 44 0 0 1 44 0 Z" fill={quoteattr(str(scheme["sky"]))}/>',
+            f'<path d="M -44 0 A 44 44 0 0 0 44 0 Z" fill={quoteattr(str(scheme["earth"]))}/>',
+            '<line x1="-44" y1="0" x2="44" y2="0" stroke="#FFFFFF" stroke-width="1.5"/>',
+            f'<path d="M -18 4 L -6 4 L 0 10 L 6 4 L 18 4" fill="none" stroke={quoteattr(ink)} stroke-width="2.5"/>',
+        ]
+    else:
+        parts += [_radial(36, 42, i / 10, ink, 1.2) for i in range(11)]
+        for kind, start, end, color in _arc_marks(scheme, inst.get("speed_arcs"), palette):
+            if kind == "line":
+                parts.append(_radial(30, 44, start, color, 3))
+            else:
+                parts.append(_arc(32 if kind == "inner" else 38, start, end, color, 5))
+        needle = _ink(scheme, "needle", "needles", default=ink)
+        x, y = _point(34, 0.3)
+        parts += [
+            f'<line x1="0" y1="0" x2="{x}" y2="{y}" stroke={quoteattr(needle)} stroke-width="2.5"/>',
+            f'<circle r="3" fill={quoteattr(needle)}/>',
+        ]
+    label_color = ink if "sky" not in scheme else "#FFFFFF"
+    parts.append(_label(str(inst.get("name") or name), 0, 30, 7, label_color, 60))
+    return f'<symbol id="inst-{name}" viewBox="-50 -50 100 100">{"".join(parts)}</symbol>'
+
+
+def display_fragment(name: str, inst: dict, palette: dict) -> str:
+    """Electronic display ``<symbol>`` in a 150x100 box."""
+    scheme = dict(inst.get("color_scheme") or {})
+    screen = _ink(scheme, "background")
+    ink = _ink(scheme, "symbology", "numbers", "labels", default="#FFFFFF")
+    parts = [
+        '<rect width="150" height="100" rx="6" fill="#111111"/>',
+        f'<rect x="5" y="5" width="140" height="90" rx="3" fill={quoteattr(screen)}/>',
+    ]
+    speed_arcs = inst.get("speed_arcs")
+    if "sky" in scheme and "earth" in scheme:
+        parts += [
+            f'<rect x="35" y="10" width="80" height="32" fill={quoteattr(str(scheme["sky"]))}/>',
+            f'<rect x="35" y="42" width="80" height="32" fill={quoteattr(str(scheme["earth"]))}/>',
+            f'<path d="M 61 44 L 71 44 L 75 48 L 79 44 L 89 44" fill="none" '
+            f'stroke={quoteattr(_ink(scheme, "aircraft_symbol", default=ink))} stroke-width="2"/>',
+            f'<rect x="10" y="10" width="18" height="64" fill="none" stroke={quoteattr(ink)}/>',
+            f'<rect x="122" y="10" width="18" height="64" fill="none" stroke={quoteattr(ink)}/>',
+            f'<path d="M 45 80 A 30 30 0 0 1 105 80" fill="none" stroke={quoteattr(ink)}/>',
+        ]
+        for kind, start, end, color in _arc_marks(scheme, speed_arcs, palette):
+            top, bottom = 74 - 64 * end, 74 - 64 * start
+            if kind == "line":
+                parts.append(f'<line x1="10" y1="{round(top, 2)}" x2="28" y2="{round(top, 2)}" '
+                             f'stroke={quoteattr(color)} stroke-width="2"/>')
+            else:
+                x = 24 if kind == "inner" else 26
+                parts.append(f'<line x1="{x}" y1="{round(top, 2)}" x2="{x}" y2="{round(bottom, 2)}" '
+                             f'stroke={quoteattr(color)} stroke-width="3"/>')
+    else:
+        marks = _arc_marks(scheme, speed_arcs, palette)
+        if marks:
+            # Engine-style page: two dials sharing the instrument's bands
+            for cx in (45, 105):
+                dial = [_radial(18, 24, i / 5, ink, 1) for i in range(6)]
+                for kind, start, end, color in marks:
+                    dial.append(_radial(14, 24, start, color, 2) if kind == "line"
+                                else _arc(21, start, end, color, 3))
+                parts.append(f'<g transform="translate({cx} 42)">{"".join(dial)}</g>')
+        else:
+            accents = [str(v) for k, v in scheme.items() if k not in ("background", "symbology", "labels")]
+            accent = accents[0] if accents else ink
+            parts += [
+                f'<path d="M 30 70 A 45 45 0 0 1 120 70" fill="none" stroke={quoteattr(ink)}/>',
+                f'<line x1="75" y1="70" x2="75" y2="22" stroke={quoteattr(accent)} stroke-width="2"/>',
+                f'<rect x="25" y="52" width="18" height="10" fill="none" stroke={quoteattr(accent)}/>',
+                f'<rect x="107" y="52" width="18" height="10" fill="none" stroke={quoteattr(accent)}/>',
+            ]
+    parts.append(_label(str(inst.get("name") or name), 75, 90, 7, ink, 120))
+    return f'<symbol id="inst-{name}" viewBox="0 0 150 100">{"".join(parts)}</symbol>'
+
+
+def build_fragment(name: str, inst: dict, kind: str, palette: dict) -> dict:
+    """One instrument's reusable fragment with its layout metadata."""
+    svg = (display_fragment if kind == "display" else gauge_fragment)(name, inst, palette)
+    return {
+        "svg": svg,
+        "kind": kind,
+        "position": inst.get("typical_position"),
+        "hash": hashlib.sha256(svg.encode()).hexdigest()[:16],
+    }
+
+
+# ============================================================================
+# Layout
+# ============================================================================
+
+def _shelf_pack(spans: list, columns: int) -> tuple:
+    """Left-to-right, top-to-bottom packing of (width, height) cell spans."""
+    positions = []
+    col = row = shelf = 0
+    for width, height in spans:
+        width = min(width, columns)
+        if col and col + width > columns:
+            row, col, shelf = row + shelf, 0, 0
+        positions.append((col, row))
+        col += width
+        shelf = max(shelf, height)
+    return positions, row + shelf
+
+
+def _place(name: str, kind: str, zone: str, slot: str, x: float, y: float, w_cells: int, h_cells: int) -> dict:
+    return {
+        "name": name, "kind": kind, "zone": zone, "slot": slot,
+        "x": x + PAD, "y": y + PAD,
+        "w": w_cells * CELL - 2 * PAD, "h": h_cells * CELL - 2 * PAD,
+    }
+
+
+def layout_panel(items: list) -> dict:
+    """Place ``(name, kind, position)`` items on a panel.
+
+    The six-pack occupies a 3x2 primary block (a display in a primary slot
+    takes the whole block); engine and navigation clusters stack to its
+    right; systems and any displaced primary instruments ("standby") run
+    beneath it.
+    """
+    placements = []
+    primary_x, primary_y = MARGIN, MARGIN + LABEL_HEIGHT
+    zones = []
+
+    primary, clusters, bottom = {}, {}, []
+    for name, kind, position in items:
+        if position in PRIMARY_SLOTS:
+            if kind == "display" and not any(k == "display" for _, k in primary.values()):
+                displaced = [(n, k, "standby") for n, k in primary.values()]
+                primary = {position: (name, kind)}
+                bottom.extend(displaced)
+            elif position in primary or any(k == "display" for _, k in primary.values()):
+                bottom.append((name, kind, "standby"))
+            else:
+                primary[position] = (name, kind)
+        elif position in SIDE_ZONES:
+            clusters.setdefault(position, []).append((name, kind, position))
+        else:
+            bottom.append((name, kind, position or BOTTOM_ZONE))
+
+    if primary:
+        zones.append(("Primary flight", primary_x, primary_y, 3 * CELL, 2 * CELL))
+        for position, (name, kind) in primary.items():
+            if kind == "display":
+                placements.append(_place(name, kind, "primary", position, primary_x, primary_y, 3, 2))
+            else:
+                col, row = PRIMARY_SLOTS[position]
+                placements.append(_place(name, kind, "primary", position,
+                                         primary_x + col * CELL, primary_y + row * CELL, 1, 1))
+
+    side_x = primary_x + 3 * CELL + MARGIN
+    height = primary_y + 2 * CELL
+    for zone in SIDE_ZONES:
+        members = clusters.get(zone)
+        if not members:
+            continue
+        spans = [(2, 2) if kind == "display" else (1, 1) for _, kind, _ in members]
+        positions, rows = _shelf_pack(spans, SIDE_COLUMNS)
+        zones.append((zone.replace("_", " ").capitalize(), side_x, primary_y, SIDE_COLUMNS * CELL, rows * CELL))
+        for (name, kind, position), (col, row), (w, h) in zip(members, positions, spans):
+            placements.append(_place(name, kind, zone, position,
+                                     side_x + col * CELL, primary_y + row * CELL, w, h))
+        height = max(height, primary_y + rows * CELL)
+        side_x += SIDE_COLUMNS * CELL + MARGIN
+
+    if bottom:
+        bottom_y = primary_y + 2 * CELL + MARGIN + LABEL_HEIGHT
+        spans = [(2, 2) if kind == "display" else (1, 1) for _, kind, _ in bottom]
+        columns = max(3, (side_x - MARGIN - primary_x) // CELL)
+        positions, rows = _shelf_pack(spans, columns)
+        zones.append(("Systems and standby", primary_x, bottom_y, columns * CELL, rows * CELL))
+        for (name, kind, slot), (col, row), (w, h) in zip(bottom, positions, spans):
+            placements.append(_place(name, kind, "systems", slot,
+                                     primary_x + col * CELL, bottom_y + row * CELL, w, h))
+        height = max(height, bottom_y + rows * CELL)
+
+    return {
+        "placements": placements,
+        "zones": [
+            {"label": label, "x": x, "y": y, "w": w, "h": h} for label, x, y, w, h in zones
+        ],
+        "width": max(side_x, primary_x + 3 * CELL + MARGIN),
+        "height": height + MARGIN,
+    }
+
+
+def t_scan_path(placements: list) -> tuple:
+    """SVG path data of the basic-T scan and the instruments on it."""
+    primary = {p["slot"]: p for p in placements if p["zone"] == "primary"}
+    center = primary.get("primary_center")
+    if center is None:
+        return None, []
+    if center["kind"] == "display":
+        # On a PFD the T is speed tape - attitude - altitude tape over heading
+        x, y, w, h = center["x"], center["y"], center["w"], center["h"]
+        left, mid, right = x + 0.12 * w, x + 0.5 * w, x + 0.88 * w
+        row, bottom = y + 0.42 * h, y + 0.82 * h
+        path = f"M {left:.1f} {row:.1f} L {right:.1f} {row:.1f} M {mid:.1f} {row:.1f} L {mid:.1f} {bottom:.1f}"
+        return path, [center["name"]]
+
+    def middle(p):
+        return p["x"] + p["w"] / 2, p["y"] + p["h"] / 2
+
+    top = [primary[slot] for slot in T_SCAN_SLOTS[:3] if slot in primary]
+    (lx, ty), (rx, _) = middle(top[0]), middle(top[-1])
+    cx, _ = middle(center)
+    path = f"M {lx:.1f} {ty:.1f} L {rx:.1f} {ty:.1f}"
+    on_scan = [p["name"] for p in top]
+    stem = primary.get("primary_bottom_center")
+    if stem is not None:
+        path += f" M {cx:.1f} {ty:.1f} L {cx:.1f} {middle(stem)[1]:.1f}"
+        on_scan.append(stem["name"])
+    return path, on_scan
+
+
+def panel_svg(layout: dict, fragments: dict, title: str, width: int,
+              t_scan: Optional[str] = None) -> str:
+    """Assemble the panel document from placed instruments and their fragments."""
+    natural_w, natural_h = layout["width"], layout["height"]
+    height = round(width * natural_h / natural_w)
+    used = sorted({p["name"] for p in layout["placements"]})
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'width="{width}" height="{height}" viewBox="0 0 {natural_w} {natural_h}">',
+        f"<title>{escape(title)}</title>",
+        "<defs>", *(fragments[name]["svg"] for name in used), "</defs>",
+        f'<rect width="{natural_w}" height="{natural_h}" rx="12" fill="{PANEL_COLOR}"/>',
+    ]
+    for zone in layout["zones"]:
+        parts.append(f'<rect x="{zone["x"]}" y="{zone["y"]}" width="{zone["w"]}" height="{zone["h"]}" '
+                     f'rx="8" fill="{ZONE_COLOR}"/>')
+        parts.append(f'<text x="{zone["x"] + 4}" y="{zone["y"] - 7}" font-family="sans-serif" '
+                     f'font-size="12" fill="{LABEL_COLOR}">{escape(zone["label"])}</text>')
+    if t_scan:
+        parts.append(f'<path d="{t_scan}" fill="none" stroke="{T_SCAN_COLOR}" stroke-opacity="0.35" '
+                     f'stroke-width="{int(CELL * 0.7)}" stroke-linecap="round"/>')
+    for p in layout["placements"]:
+        parts.append(f'<use href="#inst-{p["name"]}" xlink:href="#inst-{p["name"]}" '
+                     f'x="{p["x"]}" y="{p["y"]}" width="{p["w"]}" height="{p["h"]}"/>')
+    if t_scan:
+        parts.append(f'<path d="{t_scan}" fill="none" stroke="{T_SCAN_COLOR}" stroke-width="2" '
+                     f'stroke-dasharray="6 4"/>')
+    parts.append("</svg>")
+    return "".join(parts)
@@ -12,33 +12,78 @@ Cost savings: ~60-80% compared to pure LLM approaches.
 """
 
 from fastmcp import FastMCP
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import string
 import yaml
 from pathlib import Path
 from typing import Optional
 
+from . import __version__
+from .admission import AdmissionController, AdmissionMiddleware
+from .cache import DependencyCache, cached, diff_taxonomy, record_dependency
+from .profiling import ToolProfiler, reachable_ids, traced_size
+from .result_store import ResultStore, persisted
+from .schematic import build_fragment, layout_panel, panel_svg, t_scan_path
+from .singleflight import SingleFlight
+from .taxonomy_image import ensure_image, materialize
+from .traffic import TrafficRecorder, TrafficRecordingMiddleware
+
 # Load YAML taxonomies on startup BEFORE creating server
-OLOG_PATH = Path(__file__).parent / "ologs" / "instruments.yaml"
+OLOG_PATH = Path(os.environ.get(
+    "COCKPIT_OLOG_PATH", Path(__file__).parent / "ologs" / "instruments.yaml"
+))
+
+# Multi-worker mode: share one memory-mapped compiled taxonomy per host
+TAXONOMY_IMAGE_PATH = os.environ.get("COCKPIT_TAXONOMY_IMAGE")
 
-def load_olog():
-    """Load YAML taxonomy."""
-    with open(OLOG_PATH, 'r') as f:
-        return yaml.safe_load(f)
+def load_olog() -> tuple:
+    """Load YAML taxonomy and the SHA-256 of the exact bytes parsed.
 
-TAXONOMY = load_olog()
+    The hash identifies the taxonomy content being served; reading the file
+    once keeps it consistent with the taxonomy if the olog is edited mid-load.
+    """
+    source = OLOG_PATH.read_bytes()
+    return yaml.safe_load(source), hashlib.sha256(source).hexdigest()
+
+# In image mode the taxonomy is mapped once all index builders are defined
+# (see "Shared Taxonomy Image" below), so the YAML is never parsed here.
+TAXONOMY, TAXONOMY_HASH = ({}, "") if TAXONOMY_IMAGE_PATH else load_olog()
 
 # Initialize FastMCP server
 mcp = FastMCP("cockpit-design-aesthetics")
 
+# Profiling and memory tools are only registered for operators who opt in
+ADMIN_TOOLS_ENABLED = os.environ.get("COCKPIT_ADMIN_TOOLS", "").lower() in ("1", "true", "yes")
+
 
 # ============================================================================
 # Layer 1: Pure Taxonomy Lookup - Zero LLM Cost
 # ============================================================================
 # Internal implementation functions (testable)
 
+def _normalize_name(name: str) -> str:
+    """Internal: Normalize a user-supplied identifier to olog key form."""
+    return name.lower().replace(' ', '_').replace('-', '_')
+
+
+def _flatten_instruments(taxonomy: dict) -> dict:
+    """Internal: Merge all instrument categories into one name -> spec dict."""
+    instruments = {}
+    for category, insts in taxonomy.get('instruments', {}).items():
+        instruments.update(insts)
+    return instruments
+
+
 def get_aircraft_type_profile_impl(aircraft_type: str) -> dict:
     """Internal: Get instrument configuration profile for aircraft type."""
     aircraft_types = TAXONOMY.get('aircraft_types', {})
-    normalized_type = aircraft_type.lower().replace(' ', '_').replace('-', '_')
+    normalized_type = _normalize_name(aircraft_type)
+    record_dependency('aircraft_types', normalized_type)
     
     if normalized_type not in aircraft_types:
         return {
@@ -49,53 +94,56 @@ def get_aircraft_type_profile_impl(aircraft_type: str) -> dict:
     profile = aircraft_types[normalized_type]
     return {
         "aircraft_type": normalized_type,
-        "examples": profile.get('examples', []),
+        "examples": materialize(profile.get('examples', [])),
         "configuration": profile.get('instrument_configuration'),
         "complexity": profile.get('panel_complexity'),
-        "essential_instruments": profile.get('typical_instruments', {}).get('essential', []),
-        "engine_instruments": profile.get('typical_instruments', {}).get('engine', []),
-        "system_instruments": profile.get('typical_instruments', {}).get('systems', []),
-        "features": profile.get('features', [])
+        "essential_instruments": materialize(profile.get('typical_instruments', {}).get('essential', [])),
+        "engine_instruments": materialize(profile.get('typical_instruments', {}).get('engine', [])),
+        "system_instruments": materialize(profile.get('typical_instruments', {}).get('systems', [])),
+        "features": materialize(profile.get('features', []))
     }
 
 
 def get_instrument_details_impl(instrument_name: str) -> dict:
     """Internal: Get complete specifications for a single instrument."""
-    instruments = {}
-    for category, insts in TAXONOMY.get('instruments', {}).items():
-        instruments.update(insts)
+    normalized_name = _normalize_name(instrument_name)
+    record_dependency('instruments', normalized_name)
     
-    normalized_name = instrument_name.lower().replace(' ', '_').replace('-', '_')
+    # Probe each category instead of flattening; only errors need the full list
+    inst = None
+    for insts in TAXONOMY.get('instruments', {}).values():
+        if normalized_name in insts:
+            inst = insts[normalized_name]
     
-    if normalized_name not in instruments:
+    if inst is None:
         return {
             "error": f"Instrument '{instrument_name}' not found",
-            "available": list(instruments.keys())
+            "available": list(_flatten_instruments(TAXONOMY).keys())
         }
     
-    inst = instruments[normalized_name]
     return {
         "name": inst.get('name'),
-        "aliases": inst.get('aliases', []),
+        "aliases": materialize(inst.get('aliases', [])),
         "function": inst.get('function'),
-        "visual_elements": inst.get('visual_elements', []),
-        "color_scheme": inst.get('color_scheme', {}),
+        "visual_elements": materialize(inst.get('visual_elements', [])),
+        "color_scheme": materialize(inst.get('color_scheme', {})),
         "position": inst.get('typical_position'),
         "criticality": inst.get('criticality'),
-        "warning_zones": inst.get('warning_zones', {}),
-        "speed_arcs": inst.get('speed_arcs', {})
+        "warning_zones": materialize(inst.get('warning_zones', {})),
+        "speed_arcs": materialize(inst.get('speed_arcs', {}))
     }
 
 
 def get_panel_layout_rules_impl() -> dict:
     """Internal: Get spatial positioning rules for instrument panels."""
     positioning = TAXONOMY.get('positioning', {})
+    record_dependency('positioning')
     
     return {
-        "primary_scan_area": positioning.get('primary_scan_area'),
-        "engine_cluster": positioning.get('engine_cluster'),
-        "navigation_cluster": positioning.get('navigation_cluster'),
-        "systems_cluster": positioning.get('systems_cluster'),
+        "primary_scan_area": materialize(positioning.get('primary_scan_area')),
+        "engine_cluster": materialize(positioning.get('engine_cluster')),
+        "navigation_cluster": materialize(positioning.get('navigation_cluster')),
+        "systems_cluster": materialize(positioning.get('systems_cluster')),
         "design_principles": {
             "primary_scan": "T-shaped arrangement with attitude indicator as anchor",
             "eye_movement": "Minimize eye travel between critical instruments",
@@ -107,13 +155,15 @@ def get_panel_layout_rules_impl() -> dict:
 
 def get_color_standards_impl() -> dict:
     """Internal: Get standard cockpit color conventions."""
-    return TAXONOMY.get('color_standards', {})
+    record_dependency('color_standards')
+    return materialize(TAXONOMY.get('color_standards', {}))
 
 
 def get_era_profile_impl(era: str) -> dict:
     """Internal: Get visual characteristics for a specific era of cockpit design."""
     eras = TAXONOMY.get('eras', {})
-    normalized_era = era.lower().replace(' ', '_').replace('-', '_')
+    normalized_era = _normalize_name(era)
+    record_dependency('eras', normalized_era)
     
     if normalized_era not in eras:
         return {
@@ -126,17 +176,15 @@ def get_era_profile_impl(era: str) -> dict:
         "era": normalized_era,
         "period": era_data.get('period'),
         "description": era_data.get('description'),
-        "visual_characteristics": era_data.get('visual_characteristics', []),
-        "materials": era_data.get('materials', []),
-        "advantages": era_data.get('advantages', [])
+        "visual_characteristics": materialize(era_data.get('visual_characteristics', [])),
+        "materials": materialize(era_data.get('materials', [])),
+        "advantages": materialize(era_data.get('advantages', []))
     }
 
 
 def list_available_options_impl() -> dict:
     """Internal: Get all available options across all dimensions."""
-    instruments = {}
-    for category, insts in TAXONOMY.get('instruments', {}).items():
-        instruments.update(insts)
+    instruments = _flatten_instruments(TAXONOMY)
     
     return {
         "aircraft_types": list(TAXONOMY.get('aircraft_types', {}).keys()),
@@ -148,20 +196,182 @@ def list_available_options_impl() -> dict:
     }
 
 
+# ============================================================================
+# Era Compatibility - Precomputed Bitmasks
+# ============================================================================
+# Each era gets one bit; each instrument gets a mask of the eras it exists
+# in. Substitutions are resolved once per era so filtering a panel is a
+# dict lookup and a bitwise AND per instrument.
+
+def build_era_compatibility(taxonomy: dict) -> dict:
+    """Build era bits, instrument era masks and per-era substitution tables."""
+    era_bits = {era: 1 << i for i, era in enumerate(taxonomy.get('eras', {}))}
+    all_eras = (1 << len(era_bits)) - 1
+    instruments = _flatten_instruments(taxonomy)
+
+    masks = {}
+    for name, inst in instruments.items():
+        availability = inst.get('era_availability')
+        if availability is None:
+            masks[name] = all_eras
+            continue
+        mask = 0
+        for era, available in availability.items():
+            if available and era in era_bits:
+                mask |= era_bits[era]
+        masks[name] = mask
+
+    substitutions = {}
+    for era, bit in era_bits.items():
+        table = {}
+        for name, inst in instruments.items():
+            if masks[name] & bit:
+                continue
+            # Follow the glass_equivalent chain to the first instrument
+            # that exists in this era; no match means the instrument is dropped.
+            seen = {name}
+            candidate = inst.get('glass_equivalent')
+            while candidate and candidate not in seen:
+                if masks.get(candidate, 0) & bit:
+                    table[name] = candidate
+                    break
+                seen.add(candidate)
+                candidate = instruments.get(candidate, {}).get('glass_equivalent')
+        substitutions[era] = table
+
+    return {
+        "era_bits": era_bits,
+        "instrument_masks": masks,
+        "substitutions": substitutions,
+        "equivalents": {
+            name: inst['glass_equivalent']
+            for name, inst in instruments.items() if inst.get('glass_equivalent')
+        }
+    }
+
+
+ERA_COMPATIBILITY = build_era_compatibility(TAXONOMY)
+
+
+def resolve_instruments_for_era(instruments: list, era: str) -> dict:
+    """Internal: Filter and substitute an instrument list for an era.
+
+    Instruments unknown to the taxonomy pass through unchanged. Substituted
+    instruments that collapse onto the same replacement appear once.
+    """
+    bit = ERA_COMPATIBILITY['era_bits'].get(era, 0)
+    masks = ERA_COMPATIBILITY['instrument_masks']
+    table = ERA_COMPATIBILITY['substitutions'].get(era, {})
+
+    equivalents = ERA_COMPATIBILITY['equivalents']
+    
+    resolved = []
+    substituted = {}
+    unavailable = []
+    for name in instruments:
+        # The result depends on every instrument along the substitution chain
+        chain = {name}
+        link = name
+        while link is not None:
+            record_dependency('instruments', link)
+            link = equivalents.get(link)
+            if link in chain:
+                break
+            chain.add(link)
+        mask = masks.get(name)
+        if mask is None or mask & bit:
+            target = name
+        elif name in table:
+            target = table[name]
+            substituted[name] = target
+        else:
+            unavailable.append(name)
+            continue
+        if target not in resolved:
+            resolved.append(target)
+
+    return {
+        "instruments": resolved,
+        "substitutions": substituted,
+        "unavailable": unavailable
+    }
+
+
+def get_era_instrument_mapping_impl(era: Optional[str] = None) -> dict:
+    """Internal: Get instrument availability and substitutions per era."""
+    era_bits = ERA_COMPATIBILITY['era_bits']
+    masks = ERA_COMPATIBILITY['instrument_masks']
+
+    if era is None:
+        selected = list(era_bits.keys())
+    else:
+        normalized_era = _normalize_name(era)
+        if normalized_era not in era_bits:
+            return {
+                "error": f"Era '{era}' not found",
+                "available_eras": list(era_bits.keys())
+            }
+        selected = [normalized_era]
+
+    mapping = {}
+    for name in selected:
+        bit = era_bits[name]
+        substitutions = ERA_COMPATIBILITY['substitutions'][name]
+        mapping[name] = {
+            "available": [inst for inst, mask in masks.items() if mask & bit],
+            "substitutions": dict(substitutions),
+            "unavailable": [
+                inst for inst, mask in masks.items()
+                if not mask & bit and inst not in substitutions
+            ]
+        }
+
+    return {"eras": mapping}
+
+
 # ============================================================================
 # Layer 2: Semantic Mapping - Deterministic Composition
 # ============================================================================
 
+# Shared result cache for Layer 2/3 compositions; entries are invalidated
+# per taxonomy node on reload (see reload_taxonomy_impl)
+RESULT_CACHE = DependencyCache(maxsize=2048)
+
+# Coalesces concurrent identical Layer 2/3 tool calls (see the tool wrappers)
+SINGLE_FLIGHT = SingleFlight()
+
+# Opt-in SQLite store shared by every process on the host, so a fresh
+# instance starts from results its siblings (or a warm-up run) computed.
+RESULT_STORE_PATH = os.environ.get("COCKPIT_RESULT_STORE")
+RESULT_STORE = ResultStore(
+    RESULT_STORE_PATH,
+    max_bytes=int(os.environ.get("COCKPIT_RESULT_STORE_MAX_MB", "256")) * 1024 * 1024
+) if RESULT_STORE_PATH else None
+
+# Checked after RESULT_CACHE; keyed by TAXONOMY_HASH, so reloads need no purge
+persist_result = persisted(lambda: RESULT_STORE, lambda: TAXONOMY_HASH)
+
+# Tools backed by RESULT_STORE (warm-up runs these)
+PERSISTED_TOOLS = ("suggest_instruments", "build_panel_specification", "generate_cockpit_prompt")
+
+@persist_result
 def suggest_instruments_impl(
     aircraft_type: str,
     mission_profile: Optional[str] = None,
-    complexity_level: Optional[str] = None
+    complexity_level: Optional[str] = None,
+    panel_era: Optional[str] = None
 ) -> dict:
     """Internal: Suggest instruments for a given aircraft type and mission."""
     aircraft_profile = get_aircraft_type_profile_impl(aircraft_type)
     if "error" in aircraft_profile:
         return aircraft_profile
     
+    era = None
+    if panel_era is not None:
+        era = get_era_profile_impl(panel_era)
+        if "error" in era:
+            return era
+    
     additions = {}
     if mission_profile == 'ifr_cross_country':
         additions['nav_instruments'] = ['vor_indicator', 'adf_indicator', 'dme']
@@ -170,21 +380,39 @@ def suggest_instruments_impl(
         additions['nav_instruments'] = []
         additions['simplified'] = True
     
-    return {
+    instruments = {
+        "critical": aircraft_profile.get('essential_instruments', []),
+        "engine": aircraft_profile.get('engine_instruments', []),
+        "systems": aircraft_profile.get('system_instruments', []),
+        "navigation": additions.get('nav_instruments', [])
+    }
+    
+    result = {
         "aircraft_type": aircraft_type,
         "mission": mission_profile or "general",
-        "instruments": {
-            "critical": aircraft_profile.get('essential_instruments', []),
-            "engine": aircraft_profile.get('engine_instruments', []),
-            "systems": aircraft_profile.get('system_instruments', []),
-            "navigation": additions.get('nav_instruments', [])
-        },
+        "instruments": instruments,
         "layout_style": aircraft_profile.get('configuration'),
         "panel_complexity": complexity_level or aircraft_profile.get('complexity'),
         "scan_pattern_recommendation": "instrument_flight" if mission_profile == 'ifr_cross_country' else "vfr_cruise"
     }
+    
+    if era is not None:
+        substitutions = {}
+        unavailable = []
+        for group, names in instruments.items():
+            resolved = resolve_instruments_for_era(names, era['era'])
+            instruments[group] = resolved['instruments']
+            substitutions.update(resolved['substitutions'])
+            unavailable.extend(resolved['unavailable'])
+        result['era'] = era['era']
+        result['era_substitutions'] = substitutions
+        result['era_unavailable'] = unavailable
+    
+    return result
 
 
+@cached(RESULT_CACHE)
+@persist_result
 def build_panel_specification_impl(
     aircraft_type: str,
     panel_era: str,
@@ -200,11 +428,15 @@ def build_panel_specification_impl(
     if "error" in aircraft or "error" in era:
         return {"error": "Invalid aircraft type or era"}
     
+    resolved = resolve_instruments_for_era(aircraft.get('essential_instruments', []), era['era'])
+    
     spec = {
         "aircraft_type": aircraft_type,
         "era": panel_era,
         "focus_area": focus_area or "full_panel",
-        "instruments": aircraft.get('essential_instruments', []),
+        "instruments": resolved['instruments'],
+        "era_substitutions": resolved['substitutions'],
+        "era_unavailable": resolved['unavailable'],
         "layout": positioning.get('primary_scan_area', {}),
         "era_characteristics": era.get('visual_characteristics', []),
         "materials": era.get('materials', []),
@@ -218,7 +450,8 @@ def build_panel_specification_impl(
     }
     
     if detail_level == 'comprehensive':
-        spec['scan_patterns'] = TAXONOMY.get('scan_patterns', {}).get('instrument_flight', {})
+        record_dependency('scan_patterns', 'instrument_flight')
+        spec['scan_patterns'] = materialize(TAXONOMY.get('scan_patterns', {}).get('instrument_flight', {}))
     
     return spec
 
@@ -227,6 +460,8 @@ def build_panel_specification_impl(
 # Layer 3: Claude Synthesis - Image Generation
 # ============================================================================
 
+@cached(RESULT_CACHE)
+@persist_result
 def generate_cockpit_prompt_impl(
     aircraft_type: str,
     panel_era: str,
@@ -343,6 +578,541 @@ def explain_cockpit_design_impl(aspect: str) -> dict:
         }
 
 
+# ============================================================================
+# Layer 3 (Deterministic): Precompiled Template Rendering - Zero LLM Cost
+# ============================================================================
+# High-volume jobs can skip the Claude synthesis step: prompt_templates in
+# the olog are parsed once at load and rendered with plain dict lookups.
+
+# Placeholders render_cockpit_prompt_impl fills in
+PROMPT_FIELDS = frozenset({
+    "intensity", "subject", "era", "angle", "lighting", "instruments", "materials", "context"
+})
+
+
+def compile_prompt_templates(taxonomy: dict) -> dict:
+    """Parse olog prompt templates into per-length sentence lists.
+    
+    Sentences with malformed or unknown placeholders are left out of every
+    length and reported under ``template_errors``, so one olog typo cannot
+    break rendering.
+    """
+    templates = taxonomy.get('prompt_templates', {})
+    formatter = string.Formatter()
+    
+    sentences = {}
+    errors = {}
+    for name, text in templates.get('sentences', {}).items():
+        try:
+            fields = tuple(field for _, field, _, _ in formatter.parse(text) if field is not None)
+        except ValueError as exc:
+            errors[name] = f"Malformed template: {exc}"
+            continue
+        unknown = sorted(set(fields) - PROMPT_FIELDS)
+        if unknown:
+            errors[name] = "Unknown placeholders: " + ", ".join(f"{{{field}}}" for field in unknown)
+            continue
+        sentences[name] = (name, text, fields)
+    
+    for name, error in errors.items():
+        logging.getLogger(__name__).warning("Prompt template sentence '%s' skipped: %s", name, error)
+    
+    lengths = {}
+    for length, preset in templates.get('lengths', {}).items():
+        lengths[length] = {
+            "sentences": [sentences[name] for name in preset.get('sentences', []) if name in sentences],
+            "max_instruments": preset.get('max_instruments', 4)
+        }
+    
+    return {
+        "lengths": lengths,
+        "eras": templates.get('eras', {}),
+        "viewing_angles": templates.get('viewing_angles', {}),
+        "lighting": templates.get('lighting', {}),
+        "detail_intensity": templates.get('detail_intensity', {}),
+        "instrument_names": {
+            name: inst.get('name', name.replace('_', ' '))
+            for name, inst in _flatten_instruments(taxonomy).items()
+        },
+        "template_errors": errors
+    }
+
+
+PROMPT_TEMPLATES = compile_prompt_templates(TAXONOMY)
+
+
+# Shorter limits would leave no more than a word or two of the core sentence
+MIN_PROMPT_CHARACTERS = 20
+
+
+def _fit_sentences(sentences: list, max_characters: int) -> str:
+    """Internal: Drop optional sentences, then words, until the prompt fits."""
+    kept = list(sentences)
+    prompt = ". ".join(text for _, text in kept) + "."
+    # The core sentence and caller-supplied context are dropped last
+    while len(prompt) > max_characters:
+        optional = [i for i, (name, _) in enumerate(kept) if name not in ('core', 'context')]
+        if not optional:
+            break
+        del kept[optional[-1]]
+        prompt = ". ".join(text for _, text in kept) + "."
+    if len(prompt) > max_characters:
+        cut = prompt[:max_characters - 1]  # room for the closing period
+        if prompt[len(cut)] != ' ' and ' ' in cut:
+            cut = cut.rsplit(' ', 1)[0]
+        prompt = cut.rstrip(',;:. ') + "."
+    return prompt
+
+
+def render_cockpit_prompt_impl(
+    aircraft_type: str,
+    panel_era: str,
+    viewing_angle: str = "front_center",
+    lighting_condition: str = "daytime",
+    detail_intensity: str = "realistic",
+    additional_context: Optional[str] = None,
+    length: str = "medium",
+    max_characters: Optional[int] = None
+) -> dict:
+    """Internal: Render a finished image-generation prompt without an LLM call."""
+    if max_characters is not None and max_characters < MIN_PROMPT_CHARACTERS:
+        return {"error": f"max_characters must be at least {MIN_PROMPT_CHARACTERS}"}
+    
+    compiled = PROMPT_TEMPLATES
+    preset = compiled['lengths'].get(length)
+    if preset is None:
+        return {
+            "error": f"Length '{length}' not found",
+            "available_lengths": list(compiled['lengths'].keys())
+        }
+    
+    spec = build_panel_specification_impl(aircraft_type, panel_era, "full_panel", "comprehensive")
+    if "error" in spec:
+        return spec
+    
+    era_key = _normalize_name(panel_era)
+    names = compiled['instrument_names']
+    fields = {
+        "intensity": compiled['detail_intensity'].get(detail_intensity, detail_intensity),
+        "subject": f"{aircraft_type.replace('_', ' ')} cockpit instrument panel",
+        "era": compiled['eras'].get(era_key, era_key.replace('_', ' ')),
+        "angle": compiled['viewing_angles'].get(viewing_angle, viewing_angle),
+        "lighting": compiled['lighting'].get(lighting_condition, lighting_condition),
+        "instruments": ", ".join(
+            names.get(name, name) for name in spec['instruments'][:preset['max_instruments']]
+        ),
+        "materials": ", ".join(spec.get('materials', [])).lower(),
+        "context": (additional_context or "").strip().rstrip('.')
+    }
+    
+    sentences = []
+    for name, text, keys in preset['sentences']:
+        if keys:
+            if not all(fields[key] for key in keys):
+                continue
+            text = text.format_map(fields)
+        sentences.append((name, text))
+    
+    if max_characters is not None:
+        prompt = _fit_sentences(sentences, max_characters)
+    else:
+        prompt = ". ".join(text for _, text in sentences) + "."
+    
+    return {
+        "prompt": prompt,
+        "length": length,
+        "characters": len(prompt),
+        "renderer": "deterministic"
+    }
+
+
+# ============================================================================
+# Panel Schematic - Cached SVG Preview
+# ============================================================================
+# Every instrument is drawn once per taxonomy as a reusable SVG <symbol>;
+# a panel places <use> references to them. Rendered panels are stored by a
+# hash of their content, so repeat renders (and renders whose inputs did not
+# change across a reload) are a lookup.
+
+SCHEMATIC_STANDARD_COLORS = {
+    "red": "warning",
+    "yellow": "caution",
+    "green": "safe_normal",
+    "white": "information"
+}
+
+
+def compile_schematic_fragments(taxonomy: dict) -> dict:
+    """Build the SVG fragment of every instrument in the taxonomy."""
+    standards = taxonomy.get('color_standards', {})
+    palette = {
+        name: standards[key]['color']
+        for name, key in SCHEMATIC_STANDARD_COLORS.items()
+        if key in standards and 'color' in standards[key]
+    }
+    fragments = {}
+    for category, insts in taxonomy.get('instruments', {}).items():
+        kind = "display" if category == 'electronic_displays' else "gauge"
+        for name, inst in insts.items():
+            fragments[name] = build_fragment(name, inst, kind, palette)
+    return fragments
+
+
+SCHEMATIC_FRAGMENTS = compile_schematic_fragments(TAXONOMY)
+
+# Content hash -> rendered SVG; no dependencies, the key is the content
+SCHEMATIC_CACHE = DependencyCache(maxsize=256)
+
+
+@cached(RESULT_CACHE)
+def render_panel_schematic_impl(
+    aircraft_type: str,
+    panel_era: str,
+    width: int = 960,
+    highlight_t_scan: bool = True
+) -> dict:
+    """Internal: Render an SVG schematic of the panel for an aircraft and era."""
+    if not 100 <= width <= 8192:
+        return {"error": f"Width {width} out of range (100-8192 pixels)"}
+    
+    aircraft = get_aircraft_type_profile_impl(aircraft_type)
+    era = get_era_profile_impl(panel_era)
+    if "error" in aircraft or "error" in era:
+        return {"error": "Invalid aircraft type or era"}
+    
+    names = (aircraft['essential_instruments'] + aircraft['engine_instruments']
+             + aircraft['system_instruments'])
+    source = "aircraft_profile"
+    if not names:
+        # Profiles without an instrument list get the standard six-pack,
+        # picked from every instrument's position, so any instrument change
+        # (such as a new primary_* gauge) can alter the fallback
+        record_dependency('instruments')
+        names = [name for name, fragment in SCHEMATIC_FRAGMENTS.items()
+                 if fragment['kind'] == "gauge" and (fragment['position'] or "").startswith("primary_")]
+        source = "standard_six"
+    resolved = resolve_instruments_for_era(names, era['era'])
+    record_dependency('color_standards')
+    
+    fragments = {name: SCHEMATIC_FRAGMENTS[name] for name in resolved['instruments']
+                 if name in SCHEMATIC_FRAGMENTS}
+    layout = layout_panel([
+        (name, fragment['kind'], fragment['position']) for name, fragment in fragments.items()
+    ])
+    t_scan, t_scan_instruments = t_scan_path(layout['placements']) if highlight_t_scan else (None, [])
+    title = f"{aircraft_type.replace('_', ' ').title()} - {era['era'].replace('_', ' ')} panel"
+    
+    content = json.dumps({
+        "title": title,
+        "width": width,
+        "layout": layout,
+        "t_scan": t_scan,
+        "fragments": {name: fragment['hash'] for name, fragment in fragments.items()}
+    }, sort_keys=True)
+    content_hash = hashlib.sha256(content.encode()).hexdigest()
+    
+    entry = SCHEMATIC_CACHE.get(content_hash)
+    if entry is not None:
+        svg = entry[0]
+    else:
+        svg = panel_svg(layout, fragments, title, width, t_scan)
+        SCHEMATIC_CACHE.put(content_hash, svg, frozenset())
+    
+    return {
+        "aircraft_type": aircraft_type,
+        "era": era['era'],
+        "svg": svg,
+        "content_hash": content_hash,
+        "width": width,
+        "height": round(width * layout['height'] / layout['width']),
+        "instrument_source": source,
+        "instruments": [
+            {"name": p['name'], "zone": p['zone'], "slot": p['slot']} for p in layout['placements']
+        ],
+        "t_scan_instruments": t_scan_instruments,
+        "era_substitutions": resolved['substitutions'],
+        "era_unavailable": resolved['unavailable']
+    }
+
+
+# ============================================================================
+# Shared Taxonomy Image - Memory-Mapped Multi-Worker Mode
+# ============================================================================
+# With COCKPIT_TAXONOMY_IMAGE set, the taxonomy and its compiled indexes are
+# written once to a binary image and memory-mapped by every worker, so
+# adding workers does not add a private copy of the taxonomy per process.
+
+TAXONOMY_IMAGE = None
+
+# Bump whenever _compile_indexes changes what it stores in the image
+# (2: schematic_fragments)
+INDEX_VERSION = 2
+
+# Images compiled by other code are rebuilt even if the olog is unchanged
+IMAGE_BUILD_ID = f"{__version__}+{INDEX_VERSION}"
+
+
+def _compile_indexes(taxonomy: dict) -> dict:
+    """Internal: Derived indexes stored alongside the taxonomy in the image."""
+    return {
+        "era_compatibility": build_era_compatibility(taxonomy),
+        "prompt_templates": compile_prompt_templates(taxonomy),
+        "schematic_fragments": compile_schematic_fragments(taxonomy)
+    }
+
+
+def _use_taxonomy_image(image) -> None:
+    """Internal: Point TAXONOMY and its indexes at a mapped image."""
+    global TAXONOMY, TAXONOMY_HASH, ERA_COMPATIBILITY, PROMPT_TEMPLATES, SCHEMATIC_FRAGMENTS
+    global TAXONOMY_IMAGE
+    TAXONOMY_IMAGE = image
+    TAXONOMY = image.root['taxonomy']
+    TAXONOMY_HASH = image.source_hash.hex()
+    ERA_COMPATIBILITY = image.root['indexes']['era_compatibility']
+    PROMPT_TEMPLATES = image.root['indexes']['prompt_templates']
+    SCHEMATIC_FRAGMENTS = image.root['indexes']['schematic_fragments']
+
+
+if TAXONOMY_IMAGE_PATH:
+    _use_taxonomy_image(ensure_image(OLOG_PATH, TAXONOMY_IMAGE_PATH, _compile_indexes, IMAGE_BUILD_ID))
+
+
+# ============================================================================
+# Taxonomy Reload - Fine-Grained Cache Invalidation
+# ============================================================================
+
+def reload_taxonomy_impl() -> dict:
+    """Internal: Reload the olog and invalidate only cache entries it affects."""
+    global TAXONOMY, TAXONOMY_HASH, ERA_COMPATIBILITY, PROMPT_TEMPLATES, SCHEMATIC_FRAGMENTS
+    
+    if TAXONOMY_IMAGE_PATH:
+        # ensure_image recompiles the shared image only if the olog or code changed
+        image = ensure_image(OLOG_PATH, TAXONOMY_IMAGE_PATH, _compile_indexes, IMAGE_BUILD_ID)
+        changed = diff_taxonomy(TAXONOMY, image.root['taxonomy'])
+        _use_taxonomy_image(image)
+        return _reload_report(RESULT_CACHE.invalidate(changed))
+    
+    new_taxonomy, new_hash = load_olog()
+    changed = diff_taxonomy(TAXONOMY, new_taxonomy)
+    
+    TAXONOMY = new_taxonomy
+    TAXONOMY_HASH = new_hash
+    if any(path[0] in ('instruments', 'eras') for path in changed):
+        ERA_COMPATIBILITY = build_era_compatibility(TAXONOMY)
+    if any(path[0] in ('instruments', 'prompt_templates') for path in changed):
+        PROMPT_TEMPLATES = compile_prompt_templates(TAXONOMY)
+    if any(path[0] in ('instruments', 'color_standards') for path in changed):
+        SCHEMATIC_FRAGMENTS = compile_schematic_fragments(TAXONOMY)
+    
+    return _reload_report(RESULT_CACHE.invalidate(changed))
+
+
+def _reload_report(metrics: dict) -> dict:
+    """Internal: Invalidation metrics plus any olog template problems."""
+    errors = PROMPT_TEMPLATES['template_errors']
+    if errors:
+        return {**metrics, "prompt_template_errors": materialize(errors)}
+    return metrics
+
+
+# Tools whose result depends only on their arguments and the taxonomy, so a
+# response can be revalidated by TAXONOMY_HASH instead of being resent.
+DETERMINISTIC_TOOLS = frozenset({
+    "get_aircraft_type_profile",
+    "get_instrument_details",
+    "get_panel_layout_rules",
+    "get_color_standards",
+    "get_era_profile",
+    "get_era_instrument_mapping",
+    "list_available_options",
+    "suggest_instruments",
+    "build_panel_specification",
+    "generate_cockpit_prompt",
+    "render_cockpit_prompt",
+    "render_panel_schematic",
+    "explain_cockpit_design",
+})
+
+
+def get_cache_stats_impl() -> dict:
+    """Internal: Get result cache, single-flight and persistent store metrics."""
+    return {
+        **RESULT_CACHE.stats(),
+        "single_flight": SINGLE_FLIGHT.stats(),
+        "result_store": RESULT_STORE.stats(TAXONOMY_HASH) if RESULT_STORE else None
+    }
+
+
+# ============================================================================
+# Traffic Recording - Opt-In Call Log for Replay
+# ============================================================================
+# Registered before admission control so recorded latency includes queueing
+# and shed calls are logged too.
+
+# Identifier arguments the tool wrapper itself normalizes, so spelling
+# variants of them are the same call
+_SELF_NORMALIZED_ARGUMENTS = {
+    "build_panel_specification": ("aircraft_type", "panel_era"),
+    "generate_cockpit_prompt": ("aircraft_type", "panel_era"),
+    "render_cockpit_prompt": ("aircraft_type", "panel_era"),
+    "render_panel_schematic": ("aircraft_type", "panel_era"),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _tool_signature(tool: str) -> inspect.Signature:
+    return inspect.signature(globals()[tool])
+
+
+def normalize_tool_arguments(tool: str, arguments: dict) -> dict:
+    """Canonical arguments for a tool call: defaults filled in, keys sorted,
+    identifiers in olog key form where the tool normalizes them anyway."""
+    try:
+        bound = _tool_signature(tool).bind(**arguments)
+    except (KeyError, TypeError):
+        return dict(sorted(arguments.items()))
+    bound.apply_defaults()
+    normalized = dict(bound.arguments)
+    for name in _SELF_NORMALIZED_ARGUMENTS.get(tool, ()):
+        if isinstance(normalized.get(name), str):
+            normalized[name] = _normalize_name(normalized[name])
+    return dict(sorted(normalized.items()))
+
+
+TRAFFIC_LOG_PATH = os.environ.get("COCKPIT_TRAFFIC_LOG")
+TRAFFIC_RECORDER = None
+
+if TRAFFIC_LOG_PATH:
+    TRAFFIC_RECORDER = TrafficRecorder(
+        TRAFFIC_LOG_PATH,
+        normalize=normalize_tool_arguments,
+        include_responses=os.environ.get("COCKPIT_TRAFFIC_LOG_RESPONSES", "").lower() in ("1", "true", "yes")
+    )
+    mcp.add_middleware(TrafficRecordingMiddleware(TRAFFIC_RECORDER))
+
+
+# ============================================================================
+# Admission Control - Priority-Aware Load Shedding
+# ============================================================================
+# Interactive lookups are admitted ahead of bulk generation; tools not listed
+# here (stats, reload, admin) bypass admission entirely.
+
+TOOL_PRIORITY_CLASSES = {
+    "get_aircraft_type_profile": "interactive",
+    "get_instrument_details": "interactive",
+    "get_panel_layout_rules": "interactive",
+    "get_color_standards": "interactive",
+    "get_era_profile": "interactive",
+    "get_era_instrument_mapping": "interactive",
+    "list_available_options": "interactive",
+    "explain_cockpit_design": "interactive",
+    "suggest_instruments": "interactive",
+    "build_panel_specification": "bulk",
+    "generate_cockpit_prompt": "bulk",
+    "render_cockpit_prompt": "bulk",
+    "render_panel_schematic": "bulk",
+}
+
+# Per-tool caps keep bulk work from occupying every slot
+TOOL_CONCURRENCY_LIMITS = {
+    "build_panel_specification": 8,
+    "generate_cockpit_prompt": 8,
+    "render_cockpit_prompt": 8,
+    "render_panel_schematic": 8,
+}
+
+# Below AnyIO's default 40 worker threads, so admitted calls never wait for one
+MAX_CONCURRENT_TOOLS = int(os.environ.get("COCKPIT_MAX_CONCURRENT", "32"))
+
+ADMISSION = AdmissionController(
+    TOOL_PRIORITY_CLASSES, max_concurrent=MAX_CONCURRENT_TOOLS, tool_limits=TOOL_CONCURRENCY_LIMITS
+)
+mcp.add_middleware(AdmissionMiddleware(ADMISSION))
+
+
+def get_admission_stats_impl() -> dict:
+    """Internal: Get queue depth, admission and shed counts per priority class."""
+    return ADMISSION.stats()
+
+
+# ============================================================================
+# Admin: Profiling and Memory Footprint
+# ============================================================================
+
+PROFILER = ToolProfiler(globals())
+
+_ADMIN_IMPLS = {
+    "start_profiling_impl",
+    "stop_profiling_impl",
+    "get_profile_report_impl",
+    "get_memory_report_impl",
+}
+
+
+def start_profiling_impl(n_calls: int = 100) -> dict:
+    """Internal: Profile the next n_calls tool dispatches with cProfile."""
+    names = [
+        name for name, value in globals().items()
+        if name.endswith('_impl') and callable(value) and name not in _ADMIN_IMPLS
+    ]
+    return PROFILER.start(names, n_calls)
+
+
+def stop_profiling_impl() -> dict:
+    """Internal: End the profiling session early and return its report."""
+    PROFILER.stop()
+    return PROFILER.report()
+
+
+def get_profile_report_impl(top: int = 20, sort: str = "cumulative") -> dict:
+    """Internal: Get the hottest functions from the current or last session."""
+    return PROFILER.report(top, sort)
+
+
+def get_memory_report_impl() -> dict:
+    """Internal: Report memory held by the taxonomy, compiled indexes and caches."""
+    # Re-parse from YAML under tracemalloc; the live objects were allocated
+    # before tracing started and cannot be attributed after the fact.
+    sections = {}
+    for section, body in TAXONOMY.items():
+        text = yaml.safe_dump({section: materialize(body)})
+        sections[section] = traced_size(lambda: yaml.safe_load(text))
+    
+    olog_text = OLOG_PATH.read_text()
+    fresh = yaml.safe_load(olog_text)
+    taxonomy_ids = reachable_ids(TAXONOMY)
+    
+    taxonomy = {
+        "total_bytes": traced_size(lambda: yaml.safe_load(olog_text)),
+        "sections": sections
+    }
+    if TAXONOMY_IMAGE is not None:
+        # Sizes above are what a private copy would cost; the mapped image
+        # is shared by every worker on the host instead
+        taxonomy["shared_image"] = {"path": str(TAXONOMY_IMAGE.path), "bytes": TAXONOMY_IMAGE.size}
+    
+    return {
+        "taxonomy": taxonomy,
+        "indexes": {
+            "era_compatibility": traced_size(lambda: build_era_compatibility(fresh)),
+            "prompt_templates": traced_size(lambda: compile_prompt_templates(fresh)),
+            "schematic_fragments": traced_size(lambda: compile_schematic_fragments(fresh))
+        },
+        "caches": {
+            "result_cache": {
+                "entries": len(RESULT_CACHE),
+                "bytes": RESULT_CACHE.footprint(exclude=taxonomy_ids)
+            },
+            "schematic_cache": {
+                "entries": len(SCHEMATIC_CACHE),
+                "bytes": SCHEMATIC_CACHE.footprint()
+            }
+        },
+        "method": "tracemalloc for taxonomy and indexes; recursive getsizeof "
+                  "for caches, excluding objects shared with the taxonomy"
+    }
+
+
 # ============================================================================
 # FastMCP Tool Decorators
 # ============================================================================
@@ -377,6 +1147,12 @@ def get_era_profile(era: str) -> dict:
     return get_era_profile_impl(era)
 
 
+@mcp.tool()
+def get_era_instrument_mapping(era: Optional[str] = None) -> dict:
+    """Get which instruments exist in each era and their era substitutes."""
+    return get_era_instrument_mapping_impl(era)
+
+
 @mcp.tool()
 def list_available_options() -> dict:
     """Get all available options across all dimensions."""
@@ -387,10 +1163,11 @@ def list_available_options() -> dict:
 def suggest_instruments(
     aircraft_type: str,
     mission_profile: Optional[str] = None,
-    complexity_level: Optional[str] = None
+    complexity_level: Optional[str] = None,
+    panel_era: Optional[str] = None
 ) -> dict:
     """Suggest instruments for a given aircraft type and mission."""
-    return suggest_instruments_impl(aircraft_type, mission_profile, complexity_level)
+    return suggest_instruments_impl(aircraft_type, mission_profile, complexity_level, panel_era)
 
 
 @mcp.tool()
@@ -401,7 +1178,10 @@ def build_panel_specification(
     detail_level: str = "medium"
 ) -> dict:
     """Build complete semantic bridge for cockpit panel design."""
-    return build_panel_specification_impl(aircraft_type, panel_era, focus_area, detail_level)
+    args = (_normalize_name(aircraft_type), _normalize_name(panel_era), focus_area, detail_level)
+    return SINGLE_FLIGHT.do(
+        ("build_panel_specification",) + args, build_panel_specification_impl, *args
+    )
 
 
 @mcp.tool()
@@ -414,10 +1194,42 @@ def generate_cockpit_prompt(
     additional_context: Optional[str] = None
 ) -> dict:
     """Generate vivid image generation prompt for a cockpit."""
-    return generate_cockpit_prompt_impl(
-        aircraft_type, panel_era, viewing_angle, 
+    args = (
+        _normalize_name(aircraft_type), _normalize_name(panel_era), viewing_angle,
         lighting_condition, detail_intensity, additional_context
     )
+    return SINGLE_FLIGHT.do(("generate_cockpit_prompt",) + args, generate_cockpit_prompt_impl, *args)
+
+
+@mcp.tool()
+def render_cockpit_prompt(
+    aircraft_type: str,
+    panel_era: str,
+    viewing_angle: str = "front_center",
+    lighting_condition: str = "daytime",
+    detail_intensity: str = "realistic",
+    additional_context: Optional[str] = None,
+    length: str = "medium",
+    max_characters: Optional[int] = None
+) -> dict:
+    """Render a finished image-generation prompt deterministically (no LLM step)."""
+    return render_cockpit_prompt_impl(
+        _normalize_name(aircraft_type), _normalize_name(panel_era), viewing_angle,
+        lighting_condition, detail_intensity, additional_context, length, max_characters
+    )
+
+
+@mcp.tool()
+def render_panel_schematic(
+    aircraft_type: str,
+    panel_era: str,
+    width: int = 960,
+    highlight_t_scan: bool = True
+) -> dict:
+    """Render an SVG schematic of the instrument panel layout (preview before image generation)."""
+    return render_panel_schematic_impl(
+        _normalize_name(aircraft_type), _normalize_name(panel_era), width, highlight_t_scan
+    )
 
 
 @mcp.tool()
@@ -426,5 +1238,46 @@ def explain_cockpit_design(aspect: str) -> dict:
     return explain_cockpit_design_impl(aspect)
 
 
+@mcp.tool()
+def get_admission_stats() -> dict:
+    """Get tool admission queue depths, wait times and shed request counts."""
+    return get_admission_stats_impl()
+
+
+# Reloading re-parses the olog and rebuilds every index (and, in image mode,
+# the shared image), outside admission control: operators only.
+if ADMIN_TOOLS_ENABLED:
+
+    @mcp.tool()
+    def reload_taxonomy() -> dict:
+        """Admin: Reload the olog from disk, invalidating only affected cached results."""
+        return reload_taxonomy_impl()
+
+    @mcp.tool()
+    def get_cache_stats() -> dict:
+        """Admin: Get result cache, reload survival and request coalescing statistics."""
+        return get_cache_stats_impl()
+
+    @mcp.tool()
+    def start_profiling(n_calls: int = 100) -> dict:
+        """Admin: Profile the next n_calls tool dispatches."""
+        return start_profiling_impl(n_calls)
+
+    @mcp.tool()
+    def stop_profiling() -> dict:
+        """Admin: Stop the active profiling session and return its report."""
+        return stop_profiling_impl()
+
+    @mcp.tool()
+    def get_profile_report(top: int = 20, sort: str = "cumulative") -> dict:
+        """Admin: Get the hottest functions (sort by 'cumulative' or 'tottime')."""
+        return get_profile_report_impl(top, sort)
+
+    @mcp.tool()
+    def get_memory_report() -> dict:
+        """Admin: Get memory held by the taxonomy, indexes and caches."""
+        return get_memory_report_impl()
+
+
 if __name__ == "__main__":
     mcp.run()
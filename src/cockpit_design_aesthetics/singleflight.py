@@ -0,0 +1,74 @@
+"""
+Single-flight coalescing for concurrent identical tool calls.
+
+Right after a cache flush or taxonomy reload many agent sessions send the
+same ``generate_cockpit_prompt`` / ``build_panel_specification`` arguments at
+once. Sync tools run in worker threads, so the first caller for a key
+computes the result while later callers with the same key block on it and
+receive the same value (or exception) instead of recomputing it.
+"""
+
+import threading
+from typing import Callable, Hashable
+
+
+class _Call:
+    __slots__ = ("done", "value", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls sharing a key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """Run ``fn`` once per in-flight ``key``; concurrent callers share its result."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn(*args, **kwargs)
+            return call.value
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+                # Callers currently blocked on an in-flight leader
+                "waiting": sum(call.waiters for call in self._calls.values()),
+                "coalesced_ratio": round(self.coalesced / total, 4) if total else 0.0
+            }
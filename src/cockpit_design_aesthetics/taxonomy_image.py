@@ -0,0 +1,388 @@
+"""
+Compiled, read-only taxonomy image shared between worker processes.
+
+When several server processes run on one host, each would otherwise parse
+``instruments.yaml`` and hold a private copy of ``TAXONOMY`` plus every
+derived index. Instead the first worker compiles the taxonomy (and the
+indexes) into a binary image file, and every worker memory-maps it. The OS
+page cache holds one copy; workers read it through lightweight proxies that
+decode a node only when it is accessed.
+
+Image layout (little-endian)::
+
+    header   magic, version, sha256 of the source olog, sha256 of the build
+             id, string table offset/count, root node offset
+    strings  u32 offsets[count + 1], then the UTF-8 blob (deduplicated)
+    nodes    tagged nodes; containers hold u32 offsets of their children
+
+Dict nodes keep insertion order for iteration plus a key-sorted permutation
+for O(log n) lookup. Proxies are read-only; call :func:`materialize` before
+handing data to code that needs plain ``dict``/``list`` objects (JSON
+serialization, YAML dumps). The most recently materialized nodes are
+memoized per image (a bounded LRU), so repeated lookups share one object
+the way they share the parsed taxonomy in private mode without letting a
+sweep over the whole taxonomy copy it into every worker's heap.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Callable
+
+import yaml
+
+MAGIC = b"CKPTIMG1"
+VERSION = 2
+
+# Materialized nodes kept per image
+MEMO_SIZE = 1024
+
+_HEADER = struct.Struct("<8sII32s32sQQQ")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+
+_NULL, _FALSE, _TRUE, _INT, _FLOAT, _STR, _LIST, _DICT, _BIGINT = range(9)
+
+# Sort rank of scalar key types inside dict nodes
+_KEY_RANK = {_NULL: 0, _FALSE: 1, _TRUE: 1, _INT: 1, _BIGINT: 1, _FLOAT: 1, _STR: 2}
+
+_I64_MIN, _I64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+# ============================================================================
+# Writing
+# ============================================================================
+
+def _collect_strings(node, strings: dict) -> None:
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, str):
+            strings.setdefault(current, len(strings))
+        elif isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple)):
+            stack.extend(current)
+
+
+def _key_sort(key):
+    if key is None:
+        return (0, 0)
+    if isinstance(key, str):
+        return (2, key.encode("utf-8"))
+    return (1, key)
+
+
+def build_image(root: dict, source_hash: bytes, build_hash: bytes = bytes(32)) -> bytes:
+    """Serialize a YAML-shaped object tree into image bytes."""
+    strings = {}
+    _collect_strings(root, strings)
+
+    blob = bytearray()
+    offsets = [0]
+    for text in strings:  # dicts preserve insertion order == index order
+        blob += text.encode("utf-8")
+        offsets.append(len(blob))
+    string_table = struct.pack(f"<{len(offsets)}I", *offsets) + bytes(blob)
+
+    table_offset = _HEADER.size
+    nodes = bytearray()
+    nodes_base = table_offset + len(string_table)
+
+    def emit(node) -> int:
+        if isinstance(node, dict):
+            keys = list(node)
+            children = [(emit(key), emit(node[key])) for key in keys]
+            order = sorted(range(len(keys)), key=lambda i: _key_sort(keys[i]))
+            body = struct.pack("<BI", _DICT, len(children))
+            body += b"".join(struct.pack("<II", k, v) for k, v in children)
+            body += struct.pack(f"<{len(order)}I", *order)
+        elif isinstance(node, (list, tuple)):
+            children = [emit(item) for item in node]
+            body = struct.pack(f"<BI{len(children)}I", _LIST, len(children), *children)
+        elif node is None:
+            body = bytes([_NULL])
+        elif node is True:
+            body = bytes([_TRUE])
+        elif node is False:
+            body = bytes([_FALSE])
+        elif isinstance(node, int) and _I64_MIN <= node <= _I64_MAX:
+            body = bytes([_INT]) + _I64.pack(node)
+        elif isinstance(node, int):
+            # Era bitmasks grow one bit per era and can exceed 64 bits
+            raw = node.to_bytes((node.bit_length() + 8) // 8, "little", signed=True)
+            body = bytes([_BIGINT]) + _U32.pack(len(raw)) + raw
+        elif isinstance(node, float):
+            body = bytes([_FLOAT]) + _F64.pack(node)
+        elif isinstance(node, str):
+            body = bytes([_STR]) + _U32.pack(strings[node])
+        else:
+            raise TypeError(f"Cannot store {type(node).__name__} in a taxonomy image")
+        offset = nodes_base + len(nodes)
+        nodes.extend(body)
+        return offset
+
+    root_offset = emit(root)
+    header = _HEADER.pack(MAGIC, VERSION, 0, source_hash, build_hash, table_offset, len(strings), root_offset)
+    return header + string_table + bytes(nodes)
+
+
+# ============================================================================
+# Reading
+# ============================================================================
+
+class TaxonomyImage:
+    """A memory-mapped taxonomy image; ``root`` is a read-only proxy tree."""
+
+    def __init__(self, path, memo_size: int = MEMO_SIZE):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mmap)
+        if len(self._buf) < _HEADER.size:
+            raise ValueError(f"{self.path} is not a taxonomy image")
+        (magic, version, _, source_hash, build_hash,
+         table_offset, count, root_offset) = _HEADER.unpack_from(self._buf)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} taxonomy image")
+        self.source_hash = source_hash
+        self.build_hash = build_hash
+        self.size = len(self._buf)
+        self._string_offsets = table_offset
+        self._string_blob = table_offset + 4 * (count + 1)
+        self.memo_size = memo_size
+        self._materialized = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self.root = self._node(root_offset)
+
+    def _string(self, index: int) -> str:
+        start, end = struct.unpack_from("<II", self._buf, self._string_offsets + 4 * index)
+        return str(self._buf[self._string_blob + start:self._string_blob + end], "utf-8")
+
+    def _string_bytes(self, index: int) -> memoryview:
+        start, end = struct.unpack_from("<II", self._buf, self._string_offsets + 4 * index)
+        return self._buf[self._string_blob + start:self._string_blob + end]
+
+    def _node(self, offset: int):
+        tag = self._buf[offset]
+        if tag == _STR:
+            return self._string(_U32.unpack_from(self._buf, offset + 1)[0])
+        if tag == _DICT:
+            return ImageDict(self, offset)
+        if tag == _LIST:
+            return ImageList(self, offset)
+        if tag == _INT:
+            return _I64.unpack_from(self._buf, offset + 1)[0]
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _FLOAT:
+            return _F64.unpack_from(self._buf, offset + 1)[0]
+        if tag == _BIGINT:
+            size = _U32.unpack_from(self._buf, offset + 1)[0]
+            return int.from_bytes(self._buf[offset + 5:offset + 5 + size], "little", signed=True)
+        return None
+
+    def _compare_key(self, offset: int, rank: int, probe) -> int:
+        """Compare the key node at ``offset`` with ``probe``: -1, 0 or 1."""
+        tag = self._buf[offset]
+        node_rank = _KEY_RANK.get(tag, 3)
+        if node_rank != rank:
+            return -1 if node_rank < rank else 1
+        if tag == _STR:
+            stored = bytes(self._string_bytes(_U32.unpack_from(self._buf, offset + 1)[0]))
+        elif tag == _NULL:
+            return 0
+        else:
+            stored = self._node(offset)
+        return (stored > probe) - (stored < probe)
+
+    def _memoized(self, offset: int, build: Callable[[], object]):
+        """Return the materialized node at ``offset``, building it on a miss."""
+        with self._memo_lock:
+            value = self._materialized.get(offset)
+            if value is not None:
+                self._materialized.move_to_end(offset)
+                return value
+        value = build()
+        with self._memo_lock:
+            value = self._materialized.setdefault(offset, value)
+            self._materialized.move_to_end(offset)
+            while len(self._materialized) > self.memo_size:
+                self._materialized.popitem(last=False)
+        return value
+
+    def close(self) -> None:
+        self._materialized.clear()
+        self._buf.release()
+        self._mmap.close()
+
+
+class ImageDict(Mapping):
+    """Read-only mapping view of a dict node."""
+
+    __slots__ = ("_image", "_count", "_entries", "_order")
+    __hash__ = None
+
+    def __init__(self, image: TaxonomyImage, offset: int):
+        self._image = image
+        self._count = _U32.unpack_from(image._buf, offset + 1)[0]
+        self._entries = offset + 5
+        self._order = self._entries + 8 * self._count
+
+    def _entry(self, position: int):
+        return struct.unpack_from("<II", self._image._buf, self._entries + 8 * position)
+
+    def _find(self, key):
+        if isinstance(key, str):
+            rank, probe = 2, key.encode("utf-8")
+        elif key is None:
+            rank, probe = 0, None
+        elif isinstance(key, (int, float)):
+            rank, probe = 1, key
+        else:
+            return None
+        image = self._image
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            position = _U32.unpack_from(image._buf, self._order + 4 * mid)[0]
+            key_offset, value_offset = self._entry(position)
+            cmp = image._compare_key(key_offset, rank, probe)
+            if cmp == 0:
+                return value_offset
+            if cmp < 0:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def __getitem__(self, key):
+        value_offset = self._find(key)
+        if value_offset is None:
+            raise KeyError(key)
+        return self._image._node(value_offset)
+
+    def __contains__(self, key) -> bool:
+        return self._find(key) is not None
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield self._image._node(self._entry(position)[0])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def items(self):
+        node = self._image._node
+        return [(node(k), node(v)) for k, v in map(self._entry, range(self._count))]
+
+    def values(self):
+        node = self._image._node
+        return [node(v) for _, v in map(self._entry, range(self._count))]
+
+    def to_python(self) -> dict:
+        return self._image._memoized(
+            self._entries, lambda: {key: materialize(item) for key, item in self.items()}
+        )
+
+    def __repr__(self) -> str:
+        return f"ImageDict({len(self)} keys)"
+
+
+class ImageList(Sequence):
+    """Read-only sequence view of a list node."""
+
+    __slots__ = ("_image", "_count", "_items")
+    __hash__ = None
+
+    def __init__(self, image: TaxonomyImage, offset: int):
+        self._image = image
+        self._count = _U32.unpack_from(image._buf, offset + 1)[0]
+        self._items = offset + 5
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._image._node(_U32.unpack_from(self._image._buf, self._items + 4 * index)[0])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        node = self._image._node
+        offsets = struct.unpack_from(f"<{self._count}I", self._image._buf, self._items)
+        return (node(offset) for offset in offsets)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, ImageList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def to_python(self) -> list:
+        return self._image._memoized(self._items, lambda: [materialize(item) for item in self])
+
+    def __repr__(self) -> str:
+        return f"ImageList({len(self)} items)"
+
+
+def materialize(value):
+    """Convert image proxies to plain dicts/lists; other values pass through."""
+    if isinstance(value, (ImageDict, ImageList)):
+        return value.to_python()
+    return value
+
+
+# ============================================================================
+# Building on demand
+# ============================================================================
+
+def ensure_image(
+    olog_path, image_path, build_indexes: Callable[[dict], dict], build_id: str = ""
+) -> TaxonomyImage:
+    """Open ``image_path``, (re)compiling it first if it is missing or stale.
+
+    The image is stale when its recorded hash differs from the olog's, or
+    when it was compiled under a different ``build_id`` (the code version
+    and index schema that produced ``build_indexes``). The rebuilt file is
+    written to a temporary name and renamed into place, so concurrent
+    workers never map a partially written image.
+    """
+    source = Path(olog_path).read_bytes()
+    digest = hashlib.sha256(source).digest()
+    build_hash = hashlib.sha256(build_id.encode()).digest()
+    image_path = Path(image_path)
+
+    try:
+        image = TaxonomyImage(image_path)
+        if image.source_hash == digest and image.build_hash == build_hash:
+            return image
+        image.close()
+    except (FileNotFoundError, ValueError):
+        pass
+
+    taxonomy = yaml.safe_load(source)
+    data = build_image({"taxonomy": taxonomy, "indexes": build_indexes(taxonomy)}, digest, build_hash)
+    image_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=image_path.parent, prefix=image_path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, image_path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return TaxonomyImage(image_path)
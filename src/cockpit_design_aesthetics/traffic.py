@@ -0,0 +1,373 @@
+"""
+Traffic record-and-replay for realistic load testing.
+
+Recording (opt-in, ``COCKPIT_TRAFFIC_LOG=/path/traffic.jsonl``): a FastMCP
+middleware times every tool call and hands the outcome to a background
+writer thread, so a call only pays for a clock read and a non-blocking queue
+put. Arguments are normalized and responses serialized off the request
+path. The file rotates at ``max_bytes`` (``traffic.jsonl.1`` is the newest
+backup). If the writer falls behind, entries are dropped and counted rather
+than slowing tool dispatch. Each line holds::
+
+    {"ts", "tool", "args", "latency_ms", "response_bytes", "response_sha256",
+     "is_error", ["error"], ["response"]}
+
+``response`` is the full payload, only with ``include_responses`` enabled
+(``COCKPIT_TRAFFIC_LOG_RESPONSES=1``); the hash is always present.
+
+Replay::
+
+    python -m cockpit_design_aesthetics.traffic replay traffic.jsonl \\
+        [--speed 1|4|max] [--concurrency 8] [--url http://127.0.0.1:8000/mcp]
+
+plays the recording (and its rotated backups) against an in-process server,
+or the HTTP server at ``--url``, on the recorded schedule scaled by
+``--speed``. It reports latency percentiles per tool next to the recorded
+ones, and diffs every response against the recording.
+"""
+
+import argparse
+import asyncio
+import atexit
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from fastmcp.server.middleware import Middleware
+
+
+def response_payload(result):
+    """JSON-compatible payload of a server or client tool result."""
+    if result.structured_content is not None:
+        return result.structured_content
+    return "".join(getattr(block, "text", "") for block in result.content or [])
+
+
+def _canonical(payload) -> bytes:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+
+# ============================================================================
+# Recording
+# ============================================================================
+
+class TrafficRecorder:
+    """Append tool-call records to a rotating JSONL file from a writer thread."""
+
+    def __init__(
+        self,
+        path,
+        normalize: Optional[Callable[[str, dict], dict]] = None,
+        include_responses: bool = False,
+        max_bytes: int = 64 * 1024 * 1024,
+        backup_count: int = 5,
+        max_pending: int = 10000,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.normalize = normalize
+        self.include_responses = include_responses
+        self._handler = logging.handlers.RotatingFileHandler(
+            self.path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        self._queue = queue.Queue(maxsize=max_pending)
+        self.recorded = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._write_loop, name="traffic-recorder", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, tool: str, arguments: dict, started: float, latency: float,
+               result=None, error: Optional[BaseException] = None) -> None:
+        """Queue one call; never blocks the caller."""
+        try:
+            self._queue.put_nowait((tool, arguments, started, latency, result, error))
+        except queue.Full:
+            self.dropped += 1
+
+    def _entry(self, tool, arguments, started, latency, result, error) -> dict:
+        args = dict(sorted((arguments or {}).items()))
+        if self.normalize is not None:
+            try:
+                args = self.normalize(tool, args)
+            except Exception:
+                pass  # keep the raw arguments; a record beats no record
+        entry = {
+            "ts": round(started, 6),
+            "tool": tool,
+            "args": args,
+            "latency_ms": round(latency * 1000, 3),
+        }
+        if error is not None:
+            entry.update(response_bytes=0, response_sha256=None, is_error=True,
+                         error=f"{type(error).__name__}: {error}")
+            return entry
+        payload = response_payload(result)
+        body = _canonical(payload)
+        entry.update(
+            response_bytes=len(body),
+            response_sha256=hashlib.sha256(body).hexdigest(),
+            is_error=bool(result.is_error),
+        )
+        if self.include_responses:
+            entry["response"] = payload
+        return entry
+
+    def _write_loop(self) -> None:
+        handler = self._handler
+        while True:
+            # Drain whatever has queued up and write it with one flush
+            batch = [self._queue.get()]
+            while batch[-1] is not None and len(batch) < 512:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = batch[-1] is None
+            items = batch[:-1] if done else batch
+            if items:
+                lines = "".join(json.dumps(self._entry(*item), default=str) + "\n" for item in items)
+                if handler.stream is None:
+                    handler.stream = handler._open()
+                handler.stream.write(lines)
+                handler.flush()
+                if handler.maxBytes and handler.stream.tell() >= handler.maxBytes:
+                    handler.doRollover()
+                self.recorded += len(items)
+            if done:
+                break
+
+    def close(self) -> None:
+        """Flush queued records and close the file (idempotent)."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._handler.close()
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "recorded": self.recorded,
+            "pending": self._queue.qsize(),
+            "dropped": self.dropped,
+        }
+
+
+class TrafficRecordingMiddleware(Middleware):
+    """FastMCP middleware feeding every tool call to a TrafficRecorder."""
+
+    def __init__(self, recorder: TrafficRecorder):
+        self.recorder = recorder
+
+    async def on_call_tool(self, context, call_next):
+        message = context.message
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            result = await call_next(context)
+        except Exception as exc:
+            self.recorder.record(message.name, message.arguments, started,
+                                 time.perf_counter() - start, error=exc)
+            raise
+        self.recorder.record(message.name, message.arguments, started,
+                             time.perf_counter() - start, result=result)
+        return result
+
+
+def read_recording(path, include_rotated: bool = True) -> list:
+    """Entries of a recording, oldest first, including rotated backups."""
+    path = Path(path)
+    files = [path]
+    if include_rotated:
+        backups = sorted(
+            (p for p in path.parent.glob(path.name + ".*") if p.suffix[1:].isdigit()),
+            key=lambda p: int(p.suffix[1:]),
+        )
+        files = backups[::-1] + files
+    entries = []
+    for file in files:
+        if not file.exists():
+            continue
+        with open(file, encoding="utf-8") as f:
+            entries.extend(json.loads(line) for line in f if line.strip())
+    entries.sort(key=lambda entry: entry["ts"])
+    return entries
+
+
+# ============================================================================
+# Replay
+# ============================================================================
+
+def percentiles(values: list, points=(50, 90, 99)) -> dict:
+    """Nearest-rank percentiles plus max, in the values' units."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {f"p{p}": round(ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))], 3)
+              for p in points}
+    result["max"] = round(ordered[-1], 3)
+    return result
+
+
+def diff_paths(recorded, replayed, path: str = "$", limit: int = 10) -> list:
+    """JSON paths where two payloads differ (at most ``limit``)."""
+    out = []
+
+    def walk(a, b, where):
+        if len(out) >= limit:
+            return
+        if isinstance(a, dict) and isinstance(b, dict):
+            for key in sorted(set(a) | set(b), key=str):
+                if key not in a or key not in b:
+                    out.append(f"{where}.{key}")
+                else:
+                    walk(a[key], b[key], f"{where}.{key}")
+        elif isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+            for i, (x, y) in enumerate(zip(a, b)):
+                walk(x, y, f"{where}[{i}]")
+        elif a != b:
+            out.append(where)
+
+    walk(recorded, replayed, path)
+    return out
+
+
+async def replay(entries: list, client, speed: Optional[float] = 1.0, concurrency: int = 8) -> dict:
+    """Replay ``entries`` through an open fastmcp ``client``.
+
+    ``speed`` scales the recorded inter-arrival times (2.0 = twice as fast);
+    ``None`` sends as fast as ``concurrency`` allows.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    latencies, by_tool, mismatches, errors = [], {}, [], []
+    max_lag = 0.0
+
+    async def run(entry):
+        start = time.perf_counter()
+        try:
+            result = await client.call_tool(entry["tool"], entry["args"], raise_on_error=False)
+        except Exception as exc:
+            errors.append({"tool": entry["tool"], "args": entry["args"], "error": f"{type(exc).__name__}: {exc}"})
+            return
+        finally:
+            semaphore.release()
+        latency = (time.perf_counter() - start) * 1000
+        latencies.append(latency)
+        by_tool.setdefault(entry["tool"], []).append(latency)
+        if entry.get("response_sha256") is None:
+            return
+        payload = response_payload(result)
+        if hashlib.sha256(_canonical(payload)).hexdigest() != entry["response_sha256"]:
+            mismatch = {"tool": entry["tool"], "args": entry["args"]}
+            if "response" in entry:
+                mismatch["diff"] = diff_paths(entry["response"], json.loads(_canonical(payload)))
+            mismatches.append(mismatch)
+
+    tasks = []
+    began = loop.time()
+    first_ts = entries[0]["ts"] if entries else 0.0
+    for entry in entries:
+        if speed:
+            due = began + (entry["ts"] - first_ts) / speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await semaphore.acquire()
+        if speed:
+            max_lag = max(max_lag, loop.time() - due)
+        tasks.append(asyncio.create_task(run(entry)))
+    await asyncio.gather(*tasks)
+    duration = loop.time() - began
+
+    recorded_by_tool = {}
+    for entry in entries:
+        recorded_by_tool.setdefault(entry["tool"], []).append(entry["latency_ms"])
+    return {
+        "calls": len(entries),
+        "speed": speed or "max",
+        "concurrency": concurrency,
+        "duration_s": round(duration, 3),
+        "throughput_per_s": round(len(entries) / duration, 1) if duration else None,
+        "max_schedule_lag_ms": round(max_lag * 1000, 3),
+        "latency_ms": percentiles(latencies),
+        "recorded_latency_ms": percentiles([entry["latency_ms"] for entry in entries]),
+        "by_tool": {
+            tool: {
+                "calls": len(values),
+                "latency_ms": percentiles(values),
+                "recorded_latency_ms": percentiles(recorded_by_tool[tool]),
+            }
+            for tool, values in sorted(by_tool.items())
+        },
+        "errors": len(errors),
+        "error_examples": errors[:10],
+        "mismatches": len(mismatches),
+        "mismatch_examples": mismatches[:10],
+    }
+
+
+def _print_report(report: dict) -> None:
+    print(f"{report['calls']} calls at speed {report['speed']}, concurrency {report['concurrency']}: "
+          f"{report['duration_s']}s, {report['throughput_per_s']} calls/s, "
+          f"max schedule lag {report['max_schedule_lag_ms']}ms")
+    print(f"{'tool':<28} {'calls':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'rec p50':>8} {'rec p99':>8}  (ms)")
+    rows = [("ALL", {"calls": report["calls"], "latency_ms": report["latency_ms"],
+                     "recorded_latency_ms": report["recorded_latency_ms"]})]
+    for tool, row in [*rows, *report["by_tool"].items()]:
+        live, rec = row["latency_ms"], row["recorded_latency_ms"]
+        print(f"{tool:<28} {row['calls']:>6} {live.get('p50', 0):>8.2f} {live.get('p90', 0):>8.2f} "
+              f"{live.get('p99', 0):>8.2f} {live.get('max', 0):>8.2f} "
+              f"{rec.get('p50', 0):>8.2f} {rec.get('p99', 0):>8.2f}")
+    print(f"errors: {report['errors']}, response mismatches: {report['mismatches']}")
+    for mismatch in report["mismatch_examples"]:
+        print(f"  {mismatch['tool']} {json.dumps(mismatch['args'])}: {', '.join(mismatch.get('diff', ['hash differs']))}")
+    for error in report["error_examples"]:
+        print(f"  {error['tool']} {json.dumps(error['args'])}: {error['error']}")
+
+
+async def _replay_main(args) -> dict:
+    from fastmcp import Client
+
+    entries = read_recording(args.recording)
+    if args.url:
+        target = args.url
+    else:
+        from .server import mcp
+        target = mcp
+    async with Client(target) as client:
+        return await replay(entries, client, speed=args.speed, concurrency=args.concurrency)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded tool-call traffic log")
+    commands = parser.add_subparsers(dest="command", required=True)
+    replay_parser = commands.add_parser("replay", help="play a recording back and report latency and diffs")
+    replay_parser.add_argument("recording")
+    replay_parser.add_argument("--speed", default="1",
+                               type=lambda s: None if s == "max" else float(s.rstrip("x")),
+                               help="playback speed: 1, 4 (or 4x), or max")
+    replay_parser.add_argument("--concurrency", type=int, default=8)
+    replay_parser.add_argument("--url", help="replay against this HTTP endpoint instead of in-process")
+    replay_parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(_replay_main(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    return report
+
+
+if __name__ == "__main__":
+    # Never append the replay itself to a recording
+    os.environ.pop("COCKPIT_TRAFFIC_LOG", None)
+    main()
@@ -15,7 +15,7 @@ if ! command -v pytest &> /dev/null; then
 fi
 
 # Run tests with verbose output
-python -m pytest tests/test_server.py -v --tb=short
+python -m pytest tests -v --tb=short
 
 echo ""
 echo "✅ Test suite complete!"
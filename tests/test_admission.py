@@ -0,0 +1,164 @@
+"""
+Tests for admission control and priority-aware load shedding.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from fastmcp import Client
+
+from cockpit_design_aesthetics import server
+from cockpit_design_aesthetics.admission import (
+    AdmissionController,
+    OverloadedError,
+    PriorityClass,
+)
+
+
+CLASSES = {
+    "interactive": PriorityClass(priority=0, max_queue=4, max_wait=1.0),
+    "bulk": PriorityClass(priority=1, max_queue=2, max_wait=0.05),
+}
+TOOLS = {"lookup": "interactive", "generate": "bulk", "export": "bulk"}
+
+
+def _controller(**kwargs):
+    return AdmissionController(TOOLS, classes=CLASSES, **kwargs)
+
+
+async def _hold(controller, tool, started, release, log):
+    async with controller.admit(tool):
+        log.append(tool)
+        started.set()
+        await release.wait()
+
+
+def test_per_tool_limit_queues_excess_calls():
+    async def scenario():
+        controller = _controller(max_concurrent=4, tool_limits={"generate": 1})
+        release, log = asyncio.Event(), []
+        first = asyncio.create_task(_hold(controller, "generate", asyncio.Event(), release, log))
+        second = asyncio.create_task(_hold(controller, "generate", asyncio.Event(), release, log))
+        other = asyncio.create_task(_hold(controller, "export", asyncio.Event(), release, log))
+        await asyncio.sleep(0.01)
+        # The second generate waits; a different bulk tool is not blocked by it
+        assert sorted(log) == ["export", "generate"]
+        assert controller.stats()["classes"]["bulk"]["queue_depth"] == 1
+        release.set()
+        await asyncio.gather(first, second, other)
+        assert log.count("generate") == 2
+
+    asyncio.run(scenario())
+
+
+def test_interactive_calls_are_admitted_before_bulk():
+    async def scenario():
+        controller = _controller(max_concurrent=1)
+        release, log = asyncio.Event(), []
+        blocker = asyncio.create_task(_hold(controller, "export", asyncio.Event(), asyncio.Event(), log))
+        await asyncio.sleep(0)
+        bulk = asyncio.create_task(_hold(controller, "generate", asyncio.Event(), release, log))
+        await asyncio.sleep(0)
+        lookup = asyncio.create_task(_hold(controller, "lookup", asyncio.Event(), release, log))
+        await asyncio.sleep(0)
+        blocker.cancel()
+        release.set()
+        await asyncio.gather(lookup, bulk, return_exceptions=True)
+        return log
+
+    log = asyncio.run(scenario())
+    assert log[:2] == ["export", "lookup"]
+
+
+def test_full_queue_sheds_immediately():
+    async def scenario():
+        controller = _controller(max_concurrent=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, "lookup", asyncio.Event(), release, []))
+        queued = [asyncio.create_task(_hold(controller, "generate", asyncio.Event(), release, []))
+                  for _ in range(2)]
+        await asyncio.sleep(0)
+        start = time.monotonic()
+        with pytest.raises(OverloadedError) as excinfo:
+            async with controller.admit("generate"):
+                pass
+        assert time.monotonic() - start < 0.01
+        release.set()
+        await asyncio.gather(holder, *queued, return_exceptions=True)
+        return controller, excinfo.value
+
+    controller, error = asyncio.run(scenario())
+    assert error.reason == "queue_full"
+    assert error.error.data["tool"] == "generate"
+    assert controller.stats()["classes"]["bulk"]["shed_queue_full"] == 1
+    assert controller.stats()["shed_by_tool"] == {"generate": 1}
+
+
+def test_queued_call_is_rejected_at_its_deadline():
+    async def scenario():
+        controller = _controller(max_concurrent=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, "lookup", asyncio.Event(), release, []))
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedError, match="deadline"):
+            async with controller.admit("generate"):
+                pass
+        release.set()
+        await holder
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["classes"]["bulk"]["shed_deadline"] == 1
+    assert stats["classes"]["bulk"]["queue_depth"] == 0
+    assert stats["running"] == 0
+
+
+def test_unclassified_tools_bypass_admission():
+    async def scenario():
+        controller = _controller(max_concurrent=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, "lookup", asyncio.Event(), release, []))
+        await asyncio.sleep(0)
+        async with controller.admit("get_cache_stats"):
+            pass
+        release.set()
+        await holder
+
+    asyncio.run(scenario())
+
+
+def test_server_tools_run_through_admission():
+    """Load test: bulk generation burst does not starve interactive lookups."""
+    async def scenario():
+        async with Client(server.mcp) as client:
+            before = (await client.call_tool("get_admission_stats", {})).data
+            bulk = [
+                client.call_tool("render_cockpit_prompt", {
+                    "aircraft_type": "fighter_jets", "panel_era": "hud_integration", "length": "short"
+                })
+                for _ in range(16)
+            ]
+            lookups = [
+                client.call_tool("get_instrument_details", {"instrument_name": "altimeter"})
+                for _ in range(16)
+            ]
+            results = await asyncio.gather(*bulk, *lookups)
+            after = (await client.call_tool("get_admission_stats", {})).data
+        return before, results, after
+
+    before, results, after = asyncio.run(scenario())
+    assert not any(result.is_error for result in results)
+    admitted = {
+        name: after["classes"][name]["admitted"] - before["classes"][name]["admitted"]
+        for name in ("interactive", "bulk")
+    }
+    assert admitted == {"interactive": 16, "bulk": 16}
+    assert after["running"] == 0
@@ -0,0 +1,135 @@
+"""
+Tests for the dependency-tracked result cache.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from cockpit_design_aesthetics.cache import (
+    DependencyCache,
+    cached,
+    diff_taxonomy,
+    record_dependency,
+)
+
+
+BASE = {
+    'instruments': {
+        'flight': {'altimeter': {'name': 'Altimeter'}, 'vsi': {'name': 'VSI'}},
+    },
+    'eras': {'analog': {'period': '1930s'}, 'glass': {'period': '1990s'}},
+    'color_standards': {'warning': {'color': '#FF0000'}},
+}
+
+
+def _copy(taxonomy):
+    import copy
+    return copy.deepcopy(taxonomy)
+
+
+def test_diff_taxonomy_identical():
+    """Identical taxonomies produce no changes."""
+    assert diff_taxonomy(BASE, _copy(BASE)) == set()
+
+
+def test_diff_taxonomy_modified_added_removed():
+    """Diff reports modified, added and removed nodes at node granularity."""
+    new = _copy(BASE)
+    new['instruments']['flight']['altimeter']['name'] = 'Sensitive Altimeter'
+    new['eras']['hud'] = {'period': '2000s'}
+    del new['eras']['analog']
+    assert diff_taxonomy(BASE, new) == {
+        ('instruments', 'altimeter'), ('eras', 'hud'), ('eras', 'analog')
+    }
+
+
+def test_diff_taxonomy_ignores_category_moves():
+    """Moving an instrument between categories is not a change."""
+    new = _copy(BASE)
+    new['instruments']['other'] = {'vsi': new['instruments']['flight'].pop('vsi')}
+    assert diff_taxonomy(BASE, new) == set()
+
+
+def test_cache_invalidates_only_dependents():
+    """Only entries that read a changed node are dropped."""
+    cache = DependencyCache()
+    cache.put('a', 1, frozenset({('instruments', 'altimeter')}))
+    cache.put('b', 2, frozenset({('eras', 'glass')}))
+    cache.put('c', 3, frozenset({('color_standards',)}))
+
+    metrics = cache.invalidate({('instruments', 'altimeter'), ('color_standards', 'warning')})
+    assert metrics['invalidated'] == 2
+    assert metrics['survived'] == 1
+    assert cache.get('b') == (2, frozenset({('eras', 'glass')}))
+    assert cache.get('a') is None
+    assert cache.stats()['reloads'][-1] == metrics
+
+
+def test_cache_lru_eviction():
+    """Least recently used entries are evicted past maxsize."""
+    cache = DependencyCache(maxsize=2)
+    cache.put('a', 1, frozenset())
+    cache.put('b', 2, frozenset())
+    cache.get('a')
+    cache.put('c', 3, frozenset())
+    assert cache.get('b') is None
+    assert len(cache) == 2
+
+
+def test_cached_propagates_inner_dependencies():
+    """Outer cached calls inherit dependencies of inner cached calls."""
+    cache = DependencyCache()
+
+    @cached(cache)
+    def inner(name):
+        record_dependency('eras', name)
+        return {'era': name}
+
+    @cached(cache)
+    def outer(name):
+        return {'inner': inner(name)}
+
+    outer('glass')
+    outer('glass')
+    assert cache.hits == 1
+    cache.invalidate({('eras', 'glass')})
+    assert len(cache) == 0
+
+
+def test_cached_skips_error_results():
+    """Error results are never cached."""
+    cache = DependencyCache()
+
+    @cached(cache)
+    def lookup(name):
+        return {'error': f"'{name}' not found"}
+
+    lookup('x')
+    assert len(cache) == 0
+
+
+def test_cached_drops_results_computed_across_a_reload():
+    """A reload during a call does not leave the old-taxonomy result cached."""
+    cache = DependencyCache()
+    taxonomy = {'period': '1930s'}
+
+    @cached(cache)
+    def era_period(name):
+        record_dependency('eras', name)
+        period = taxonomy['period']
+        # Reload lands while the call is still computing
+        if period == '1930s':
+            taxonomy['period'] = '1940s'
+            assert cache.invalidate({('eras', name)})['invalidated'] == 0
+        return {'period': period}
+
+    assert era_period('analog') == {'period': '1930s'}
+    assert len(cache) == 0
+    assert cache.stats()['discarded_after_reload'] == 1
+    assert era_period('analog') == {'period': '1940s'}
+    assert era_period('analog') == {'period': '1940s'}
+    assert cache.hits == 1
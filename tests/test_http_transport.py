@@ -0,0 +1,123 @@
+"""
+Tests for the Streamable HTTP transport: ETag revalidation and compression.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from starlette.testclient import TestClient
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from cockpit_design_aesthetics import server
+from cockpit_design_aesthetics.handler import http_app
+from cockpit_design_aesthetics.http_transport import ConditionalResponseMiddleware, parse_accept_encoding
+
+
+MCP_ACCEPT = "application/json, text/event-stream"
+
+
+@pytest.fixture
+def client():
+    with TestClient(http_app()) as client:
+        yield client
+
+
+def call(client, name, arguments=None, request_id=1, **headers):
+    return client.post(
+        "/mcp",
+        json={
+            "jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+            "params": {"name": name, "arguments": arguments or {}}
+        },
+        headers={"accept": MCP_ACCEPT, "accept-encoding": "identity", **headers},
+    )
+
+
+def test_deterministic_tool_gets_etag(client):
+    """Static lookups are stamped with a weak ETag; stats tools are not."""
+    response = call(client, "get_color_standards")
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('W/"')
+    assert "etag" not in call(client, "get_admission_stats").headers
+
+
+def test_etag_ignores_argument_order_and_request_id(client):
+    first = call(client, "get_era_profile", {"era": "glass_cockpit"}, request_id=1)
+    second = call(client, "get_era_profile", {"era": "glass_cockpit"}, request_id=2)
+    other = call(client, "get_era_profile", {"era": "analog_mechanical"})
+    assert first.headers["etag"] == second.headers["etag"] != other.headers["etag"]
+
+
+def test_conditional_request_returns_304_without_dispatch(client, monkeypatch):
+    """A matching If-None-Match short-circuits before the tool runs."""
+    etag = call(client, "list_available_options").headers["etag"]
+
+    calls = []
+    original = server.list_available_options_impl
+    monkeypatch.setattr(server, "list_available_options_impl", lambda: calls.append(1) or original())
+
+    response = call(client, "list_available_options", request_id=7, **{"if-none-match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert calls == []
+
+    stale = call(client, "list_available_options", **{"if-none-match": 'W/"stale"'})
+    assert stale.status_code == 200
+    assert calls == [1]
+
+
+def test_taxonomy_change_invalidates_etag(client, monkeypatch):
+    etag = call(client, "get_panel_layout_rules").headers["etag"]
+    monkeypatch.setattr(server, "TAXONOMY_HASH", "edited")
+    response = call(client, "get_panel_layout_rules", **{"if-none-match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_package_version_is_part_of_etag():
+    """A redeploy with new code never revalidates results rendered by the old one."""
+    body = json.dumps({
+        "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+        "params": {"name": "get_panel_layout_rules", "arguments": {}}
+    }).encode()
+    tags = {
+        ConditionalResponseMiddleware(
+            None, lambda: "hash", server.DETERMINISTIC_TOOLS, version=version
+        ).etag_for(body)
+        for version in ("0.1.0", "0.2.0")
+    }
+    assert len(tags) == 2
+
+
+def test_error_results_are_not_stamped(client):
+    """Tool failures may be transient, so they are never revalidated."""
+    response = call(client, "get_era_profile", {})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+def test_large_payloads_are_gzipped(client):
+    identity = call(client, "list_available_options")
+    compressed = call(client, "list_available_options", **{"accept-encoding": "gzip"})
+
+    assert "content-encoding" not in identity.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "accept-encoding"
+    assert int(compressed.headers["content-length"]) < len(identity.content)
+    # The test client transparently decodes gzip
+    assert json.loads(compressed.content)["result"] == json.loads(identity.content)["result"]
+
+
+def test_small_payloads_are_not_compressed(client):
+    response = call(client, "get_era_profile", {"era": "nonexistent"}, **{"accept-encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip;q=0.5, zstd, br;q=0") == {"gzip": 0.5, "zstd": 1.0, "br": 0.0}
@@ -0,0 +1,139 @@
+"""
+Tests for the on-demand profiler and memory footprint report.
+"""
+
+import asyncio
+import cProfile
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from cockpit_design_aesthetics import server
+from cockpit_design_aesthetics.profiling import ToolProfiler, deep_sizeof, traced_size
+
+
+def test_profiler_wraps_only_while_active():
+    """Original functions are restored after N top-level calls."""
+    def work(n):
+        return sum(range(n))
+
+    namespace = {'work_impl': work}
+    profiler = ToolProfiler(namespace)
+    profiler.start(['work_impl'], n_calls=2)
+    assert namespace['work_impl'] is not work
+
+    namespace['work_impl'](10)
+    namespace['work_impl'](10)
+    assert namespace['work_impl'] is work
+    assert not profiler.active
+
+    report = profiler.report()
+    assert report['profiled_calls'] == 2
+    assert any('work' in row['function'] for row in report['functions'])
+
+
+def test_profiler_rejects_concurrent_sessions():
+    """A second session cannot start while one is active."""
+    profiler = ToolProfiler({'f_impl': lambda: None})
+    profiler.start(['f_impl'], n_calls=5)
+    assert 'error' in profiler.start(['f_impl'], n_calls=5)
+    profiler.stop()
+    assert not profiler.active
+
+
+def test_server_profiling_session():
+    """Profiling covers tool impls and nested calls count once."""
+    original = server.generate_cockpit_prompt_impl
+    server.start_profiling_impl(n_calls=1)
+    try:
+        assert server.generate_cockpit_prompt_impl is not original
+        server.generate_cockpit_prompt(
+            'general_aviation_singles', 'analog_mechanical', additional_context='profiling'
+        )
+    finally:
+        server.stop_profiling_impl()
+    assert server.generate_cockpit_prompt_impl is original
+    report = server.get_profile_report_impl(top=5)
+    assert report['profiled_calls'] == 1
+    assert len(report['functions']) <= 5
+
+
+def test_memory_report_sections():
+    """Memory report breaks the taxonomy down by top-level olog section."""
+    report = server.get_memory_report_impl()
+    assert set(report['taxonomy']['sections']) == set(server.TAXONOMY)
+    assert report['taxonomy']['total_bytes'] > 0
+    assert report['indexes']['era_compatibility'] > 0
+    assert 'result_cache' in report['caches']
+
+
+def test_size_helpers():
+    """Size helpers count allocations and skip excluded objects."""
+    assert traced_size(lambda: [0] * 10000) >= 80000
+    shared = list(range(100))
+    assert deep_sizeof([shared], exclude={id(shared)}) < deep_sizeof([shared])
+
+
+
+def test_profiler_concurrent_calls_never_fail():
+    """Calls overlapping a profiled call succeed and are skipped, not profiled."""
+    started, release = threading.Event(), threading.Event()
+
+    def slow(n):
+        started.set()
+        release.wait(5)
+        return n
+
+    def fast(n):
+        return n
+
+    namespace = {'slow_impl': slow, 'fast_impl': fast}
+    profiler = ToolProfiler(namespace)
+    profiler.start(['slow_impl', 'fast_impl'], n_calls=10)
+    results = []
+    holder = threading.Thread(target=lambda: results.append(namespace['slow_impl'](0)))
+    holder.start()
+    started.wait(5)
+
+    others = [threading.Thread(target=lambda i=i: results.append(namespace['fast_impl'](i)))
+              for i in range(1, 5)]
+    for thread in others:
+        thread.start()
+    for thread in others:
+        thread.join(5)
+    release.set()
+    holder.join(5)
+    profiler.stop()
+
+    assert sorted(results) == [0, 1, 2, 3, 4]
+    report = profiler.report()
+    assert (report['profiled_calls'], report['skipped_calls']) == (1, 4)
+
+
+def test_profiler_runs_call_when_hook_is_taken(monkeypatch):
+    """If cProfile cannot enable (Python 3.12+ with another profiler), the call still runs."""
+    class TakenProfile(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(cProfile, "Profile", TakenProfile)
+    namespace = {'f_impl': lambda: 'ok'}
+    profiler = ToolProfiler(namespace)
+    profiler.start(['f_impl'], n_calls=1)
+    assert namespace['f_impl']() == 'ok'
+    profiler.stop()
+    assert profiler.report()['skipped_calls'] == 1
+
+
+@pytest.mark.skipif(server.ADMIN_TOOLS_ENABLED, reason="COCKPIT_ADMIN_TOOLS is set")
+def test_admin_tools_are_not_registered_by_default():
+    """Reload, cache stats and profiling tools need COCKPIT_ADMIN_TOOLS."""
+    names = {tool.name for tool in asyncio.run(server.mcp.list_tools())}
+    assert 'get_admission_stats' in names
+    assert not names & {'reload_taxonomy', 'get_cache_stats', 'start_profiling', 'get_memory_report'}
@@ -0,0 +1,197 @@
+"""
+Tests for the persistent cross-process result store.
+"""
+
+import json
+import multiprocessing
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from cockpit_design_aesthetics import result_store, server
+from cockpit_design_aesthetics.result_store import ResultStore, main, persisted, result_key
+
+
+SPEC_ARGS = ("fighter_jets", "glass_cockpit", None, "comprehensive")
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Back the server's persisted tools with a fresh store."""
+    backing = ResultStore(tmp_path / "results.sqlite")
+    monkeypatch.setattr(server, "RESULT_STORE", backing)
+    server.RESULT_CACHE.clear()
+    yield backing
+    server.RESULT_CACHE.clear()
+    backing.close()
+
+
+def _usage(path):
+    with sqlite3.connect(path) as conn:
+        total = conn.execute("SELECT total_bytes FROM usage").fetchone()[0]
+        actual = conn.execute("SELECT total(size) FROM results").fetchone()[0]
+    return total, actual
+
+
+def test_round_trip_keeps_values_and_dependencies(tmp_path):
+    store = ResultStore(tmp_path / "results.sqlite")
+    value = {"sequence": {1: "Attitude", 2: "Altimeter"}, "items": ["a", None]}
+    deps = frozenset({("eras", "glass_cockpit"), ("color_standards",)})
+
+    key = result_key("build_panel_specification_impl", {"aircraft_type": "x"}, "abc")
+    assert store.get(key) is None
+    assert store.put(key, "build_panel_specification_impl", "abc", value, deps)
+    assert store.get(key) == (value, deps)
+    assert result_key("build_panel_specification_impl", {"aircraft_type": "x"}, "def") != key
+
+    stats = store.stats("abc")
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["writes"]) == (1, 1, 1, 1)
+    assert stats["current_taxonomy_entries"] == 1
+
+
+def test_code_version_is_part_of_the_key(monkeypatch):
+    """A redeploy never serves results pickled by older code."""
+    args = ("build_panel_specification_impl", {"aircraft_type": "x"}, "abc")
+    keys = {result_key(*args)}
+    monkeypatch.setattr(result_store, "__version__", "99.0.0")
+    keys.add(result_key(*args))
+    monkeypatch.setattr(result_store, "STORE_VERSION", result_store.STORE_VERSION + 1)
+    keys.add(result_key(*args))
+    assert len(keys) == 3
+
+
+def test_lru_bump_does_not_wait_for_a_writer(tmp_path):
+    """A hit returns at once while another connection holds the write lock."""
+    path = tmp_path / "results.sqlite"
+    store = ResultStore(path, touch_interval=0.0, busy_timeout=2.0)
+    store.put("key", "f", "abc", {"ok": True}, frozenset())
+
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        start = time.monotonic()
+        assert store.get("key") == ({"ok": True}, frozenset())
+        assert time.monotonic() - start < 0.5
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+    # The connection's timeout is back for writes
+    assert store._connection().execute("PRAGMA busy_timeout").fetchone()[0] == 2000
+    assert store.stats()["errors"] == 0
+
+
+def test_eviction_keeps_store_under_bound(tmp_path):
+    path = tmp_path / "results.sqlite"
+    store = ResultStore(path, max_bytes=20_000)
+    for i in range(100):
+        store.put(f"key-{i:03d}", "f", "abc", "x" * 900, frozenset())
+
+    stats = store.stats()
+    assert stats["bytes"] <= 20_000
+    assert stats["evictions"] == 100 - stats["entries"]
+    # Least recently written entries go first
+    assert store.get("key-000") is None
+    assert store.get("key-099") is not None
+    total, actual = _usage(path)
+    assert total == actual
+
+
+def _hammer(path, worker):
+    store = ResultStore(path, max_bytes=50_000)
+    for i in range(200):
+        key = f"shared-{i % 50}"
+        if store.get(key) is None:
+            store.put(key, "f", "abc", {"worker": worker, "pad": "x" * 500}, frozenset())
+        store.put(f"own-{worker}-{i}", "f", "abc", "y" * 300, frozenset())
+    return store.stats()["errors"]
+
+
+def test_concurrent_processes_share_one_store(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    ResultStore(path)  # create the schema up front
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        errors = pool.starmap(_hammer, [(path, worker) for worker in range(4)])
+
+    assert errors == [0, 0, 0, 0]
+    total, actual = _usage(path)
+    assert total == actual <= 50_000
+
+
+def test_store_serves_fresh_process_and_replays_dependencies(store):
+    spec = server.build_panel_specification_impl(*SPEC_ARGS)
+    assert store.stats()["writes"] == 1
+
+    # A new process starts with an empty in-memory cache
+    server.RESULT_CACHE.clear()
+    assert server.build_panel_specification_impl(*SPEC_ARGS) == spec
+    assert store.stats()["hits"] == 1
+
+    # Dependencies came back with the stored result, so reloads still invalidate it
+    _, deps = server.RESULT_CACHE.get(("build_panel_specification_impl", SPEC_ARGS))
+    assert ("eras", "glass_cockpit") in deps
+    assert server.RESULT_CACHE.invalidate({("eras", "glass_cockpit")})["invalidated"] == 1
+
+
+def test_taxonomy_hash_is_part_of_the_key(store, monkeypatch):
+    server.build_panel_specification_impl(*SPEC_ARGS)
+    server.RESULT_CACHE.clear()
+    monkeypatch.setattr(server, "TAXONOMY_HASH", "0" * 64)
+    server.build_panel_specification_impl(*SPEC_ARGS)
+    assert store.stats()["hits"] == 0
+    assert store.stats()["entries"] == 2
+
+
+def test_results_computed_across_a_reload_are_not_stored(tmp_path):
+    """A reload mid-call must not file a mixed result under the old hash."""
+    store = ResultStore(tmp_path / "results.sqlite")
+    taxonomy = {"hash": "abc"}
+
+    @persisted(lambda: store, lambda: taxonomy["hash"])
+    def compose(name):
+        taxonomy["hash"] = "def"
+        return {"name": name}
+
+    assert compose("x") == {"name": "x"}
+    assert store.stats()["entries"] == 0
+    assert compose("x") == {"name": "x"}
+    assert store.stats()["entries"] == 1
+
+
+def test_errors_are_not_stored(store):
+    assert "error" in server.suggest_instruments_impl("no_such_aircraft")
+    assert store.stats()["entries"] == 0
+
+
+def test_warm_from_grid_and_recording(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(server, "RESULT_STORE", None)
+    path = tmp_path / "results.sqlite"
+    recording = tmp_path / "traffic.jsonl"
+    entries = [
+        {"ts": 1.0, "tool": "build_panel_specification",
+         "args": server.normalize_tool_arguments("build_panel_specification", {
+             "aircraft_type": "helicopters", "panel_era": "glass_cockpit", "detail_level": "comprehensive"
+         })},
+        {"ts": 2.0, "tool": "get_instrument_details", "args": {"instrument_name": "altimeter"}},
+    ]
+    recording.write_text("".join(json.dumps(entry) + "\n" for entry in entries))
+
+    report = main(["warm", str(path), "--recording", str(recording)])
+    assert (report["calls"], report["skipped"], report["errors"]) == (1, 1, 0)
+    assert report["store"]["current_taxonomy_entries"] == 1
+
+    server.RESULT_CACHE.clear()
+    report = main(["warm", str(path), "--grid"])
+    options = server.list_available_options_impl()
+    pairs = len(options["aircraft_types"]) * len(options["eras"])
+    assert report["by_tool"]["generate_cockpit_prompt"] == pairs
+    assert report["errors"] == 0
+    # generate_cockpit_prompt also stores its inner comprehensive spec
+    assert report["store"]["entries"] > 3 * pairs
+    capsys.readouterr()
@@ -0,0 +1,113 @@
+"""
+Tests for the SVG panel schematic renderer.
+"""
+
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from cockpit_design_aesthetics import server
+from cockpit_design_aesthetics.schematic import layout_panel, t_scan_path
+
+
+SVG = "{http://www.w3.org/2000/svg}"
+SIX_PACK = [
+    ("airspeed_indicator", "gauge", "primary_left"),
+    ("attitude_indicator", "gauge", "primary_center"),
+    ("altimeter", "gauge", "primary_right"),
+    ("turn_coordinator", "gauge", "primary_bottom_left"),
+    ("heading_indicator", "gauge", "primary_bottom_center"),
+    ("vertical_speed_indicator", "gauge", "primary_bottom_right"),
+]
+
+
+def _render(aircraft="general_aviation_singles", era="analog_mechanical", **kwargs):
+    server.RESULT_CACHE.clear()
+    return server.render_panel_schematic_impl(aircraft, era, **kwargs)
+
+
+def test_schematic_is_valid_svg_with_shared_fragments():
+    result = _render()
+    root = ET.fromstring(result["svg"])
+    assert root.tag == f"{SVG}svg"
+    assert root.get("width") == "960" and root.get("height") == str(result["height"])
+
+    symbols = {symbol.get("id") for symbol in root.iter(f"{SVG}symbol")}
+    uses = [use.get("href") for use in root.iter(f"{SVG}use")]
+    # Every placed instrument references its fragment instead of inlining it
+    assert sorted(uses) == sorted(f"#{symbol}" for symbol in symbols)
+    assert {entry["name"] for entry in result["instruments"]} >= {name for name, _, _ in SIX_PACK}
+    assert result["instrument_source"] == "aircraft_profile"
+
+
+def test_gauge_arcs_use_olog_colors():
+    svg = _render()["svg"]
+    airspeed = svg.split('<symbol id="inst-airspeed_indicator"')[1].split("</symbol>")[0]
+    assert 'stroke="#00AA00"' in airspeed  # green arc
+    assert 'stroke="#FF0000"' in airspeed  # red line
+
+
+def test_t_scan_highlight():
+    result = _render()
+    assert result["t_scan_instruments"] == [
+        "airspeed_indicator", "attitude_indicator", "altimeter", "heading_indicator"
+    ]
+    assert "stroke-dasharray" in result["svg"]
+
+    plain = _render(highlight_t_scan=False)
+    assert plain["t_scan_instruments"] == []
+    assert "stroke-dasharray" not in plain["svg"]
+
+
+def test_layout_keeps_basic_t_geometry():
+    placements = {p["name"]: p for p in layout_panel(SIX_PACK)["placements"]}
+    top = [placements[name] for name in ("airspeed_indicator", "attitude_indicator", "altimeter")]
+    assert len({p["y"] for p in top}) == 1
+    assert top[0]["x"] < top[1]["x"] < top[2]["x"]
+    assert placements["heading_indicator"]["x"] == placements["attitude_indicator"]["x"]
+    assert placements["heading_indicator"]["y"] > placements["attitude_indicator"]["y"]
+
+    path, names = t_scan_path(list(placements.values()))
+    assert path.startswith("M") and len(names) == 4
+
+
+def test_glass_era_uses_display_with_standby_gauge():
+    result = _render("fighter_jets", "glass_cockpit")
+    slots = {entry["name"]: entry["slot"] for entry in result["instruments"]}
+    assert slots["primary_flight_display"] == "primary_center"
+    assert slots["attitude_indicator"] == "standby"
+    assert result["instrument_source"] == "standard_six"
+    assert result["t_scan_instruments"] == ["primary_flight_display"]
+    ET.fromstring(result["svg"])
+
+
+def test_identical_panels_share_cached_svg():
+    first = _render()
+    hits = server.SCHEMATIC_CACHE.hits
+    # Result cache cleared, so the panel is rebuilt and found by content hash
+    second = _render()
+    assert second["content_hash"] == first["content_hash"]
+    assert second["svg"] is first["svg"]
+    assert server.SCHEMATIC_CACHE.hits == hits + 1
+
+    assert _render(width=480)["content_hash"] != first["content_hash"]
+
+
+def test_invalid_inputs_return_errors():
+    assert "error" in _render("no_such_aircraft")
+    assert "error" in _render(era="no_such_era")
+    assert "error" in _render(width=10)
+
+
+def test_standard_six_fallback_depends_on_every_instrument():
+    """A new primary gauge in the olog invalidates fallback schematics."""
+    _render("fighter_jets", "analog_mechanical")
+    key = ("render_panel_schematic_impl", ("fighter_jets", "analog_mechanical", 960, True))
+    assert server.RESULT_CACHE.get(key) is not None
+
+    server.RESULT_CACHE.invalidate({("instruments", "new_primary_gauge")})
+    assert server.RESULT_CACHE.get(key) is None
@@ -4,10 +4,13 @@ Tests for Cockpit Design Aesthetics MCP Server
 Tests Layer 1 (deterministic taxonomy), Layer 2 (mapping), and Layer 3 (synthesis).
 """
 
+import hashlib
 import pytest
 import sys
 from pathlib import Path
 
+import yaml
+
 # Add src to path
 src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
@@ -23,8 +26,17 @@ from cockpit_design_aesthetics.server import (
     build_panel_specification_impl,
     generate_cockpit_prompt_impl,
     explain_cockpit_design_impl,
+    render_cockpit_prompt_impl,
+    _fit_sentences,
+    MIN_PROMPT_CHARACTERS,
+    get_era_instrument_mapping_impl,
+    resolve_instruments_for_era,
+    build_era_compatibility,
+    ERA_COMPATIBILITY,
+    RESULT_CACHE,
     TAXONOMY
 )
+from cockpit_design_aesthetics import server
 
 # Aliases for convenience in tests
 get_aircraft_type_profile = get_aircraft_type_profile_impl
@@ -37,6 +49,8 @@ suggest_instruments = suggest_instruments_impl
 build_panel_specification = build_panel_specification_impl
 generate_cockpit_prompt = generate_cockpit_prompt_impl
 explain_cockpit_design = explain_cockpit_design_impl
+get_era_instrument_mapping = get_era_instrument_mapping_impl
+render_cockpit_prompt = render_cockpit_prompt_impl
 
 
 # ============================================================================
@@ -203,6 +217,182 @@ def test_build_panel_specification_comprehensive():
     assert 'scan_patterns' in result
 
 
+# ============================================================================
+# Era Compatibility Tests
+# ============================================================================
+
+def test_era_compatibility_bits_cover_all_eras():
+    """Every era gets a distinct bit in the compatibility matrix."""
+    bits = ERA_COMPATIBILITY['era_bits']
+    assert set(bits) == set(TAXONOMY['eras'])
+    assert len(set(bits.values())) == len(bits)
+
+
+def test_era_compatibility_missing_availability_means_all_eras():
+    """Instruments without era_availability are available everywhere."""
+    taxonomy = {
+        'eras': {'a': {}, 'b': {}},
+        'instruments': {'cat': {'plain': {}, 'old': {'era_availability': {'a': True}}}}
+    }
+    compat = build_era_compatibility(taxonomy)
+    assert compat['instrument_masks']['plain'] == 0b11
+    assert compat['instrument_masks']['old'] == 0b01
+
+
+def test_resolve_instruments_analog_unchanged():
+    """Analog instruments pass through unchanged in the analog era."""
+    names = ['attitude_indicator', 'altimeter', 'airspeed_indicator']
+    result = resolve_instruments_for_era(names, 'analog_mechanical')
+    assert result['instruments'] == names
+    assert result['substitutions'] == {}
+
+
+def test_resolve_instruments_glass_substitution():
+    """Mechanical instruments collapse onto their glass equivalent."""
+    names = ['attitude_indicator', 'altimeter', 'airspeed_indicator', 'tachometer']
+    result = resolve_instruments_for_era(names, 'glass_cockpit')
+    assert result['instruments'] == [
+        'attitude_indicator', 'primary_flight_display', 'engine_parameters_display'
+    ]
+    assert result['substitutions']['altimeter'] == 'primary_flight_display'
+
+
+def test_resolve_instruments_drops_without_equivalent():
+    """Glass displays have no analog equivalent and are dropped."""
+    result = resolve_instruments_for_era(['primary_flight_display', 'unknown_gauge'], 'analog_mechanical')
+    assert result['unavailable'] == ['primary_flight_display']
+    assert result['instruments'] == ['unknown_gauge']
+
+
+def test_build_panel_specification_respects_era():
+    """Glass cockpit spec never includes instruments unavailable in that era."""
+    result = build_panel_specification('general_aviation_singles', 'glass_cockpit')
+    assert 'altimeter' not in result['instruments']
+    assert 'primary_flight_display' in result['instruments']
+    assert result['era_substitutions']['turn_coordinator'] == 'primary_flight_display'
+
+
+def test_suggest_instruments_with_era():
+    """Era-aware suggestions substitute every instrument group."""
+    result = suggest_instruments(
+        'general_aviation_singles',
+        mission_profile='ifr_cross_country',
+        panel_era='glass_cockpit'
+    )
+    assert result['era'] == 'glass_cockpit'
+    assert result['instruments']['navigation'] == ['navigation_display']
+    assert result['instruments']['engine'] == ['engine_parameters_display']
+
+
+def test_suggest_instruments_invalid_era():
+    """Test error handling for invalid era in suggestions."""
+    result = suggest_instruments('general_aviation_singles', panel_era='steampunk')
+    assert 'error' in result
+
+
+def test_era_instrument_mapping():
+    """Mapping tool reports availability and substitutions per era."""
+    result = get_era_instrument_mapping('glass cockpit')
+    glass = result['eras']['glass_cockpit']
+    assert 'primary_flight_display' in glass['available']
+    assert glass['substitutions']['vor_indicator'] == 'navigation_display'
+    assert len(get_era_instrument_mapping()['eras']) == len(TAXONOMY['eras'])
+    assert 'error' in get_era_instrument_mapping('nonexistent_era')
+
+
+# ============================================================================
+# Taxonomy Reload Tests
+# ============================================================================
+
+@pytest.fixture
+def edited_olog(tmp_path, monkeypatch):
+    """Point the server at a copy of the olog and restore it afterwards."""
+    olog = tmp_path / "instruments.yaml"
+    olog.write_text(server.OLOG_PATH.read_text())
+    original_path = server.OLOG_PATH
+    monkeypatch.setattr(server, "OLOG_PATH", olog)
+    yield olog
+    monkeypatch.setattr(server, "OLOG_PATH", original_path)
+    server.reload_taxonomy_impl()
+
+
+def test_reload_unchanged_keeps_cache(edited_olog):
+    """Reloading an identical olog invalidates nothing."""
+    build_panel_specification('general_aviation_singles', 'analog_mechanical')
+    metrics = server.reload_taxonomy_impl()
+    assert metrics['invalidated'] == 0
+    assert metrics['survived'] == len(RESULT_CACHE)
+
+
+def test_reload_invalidates_only_affected_entries(edited_olog):
+    """Editing one era invalidates specs for that era only."""
+    analog = build_panel_specification('general_aviation_singles', 'analog_mechanical')
+    build_panel_specification('fighter_jets', 'hud_integration')
+    generate_cockpit_prompt('general_aviation_singles', 'analog_mechanical')
+
+    edited_olog.write_text(edited_olog.read_text().replace(
+        '"Three-pointer gauges"', '"Three-pointer steam gauges"'
+    ))
+    metrics = server.reload_taxonomy_impl()
+    assert metrics['changed_nodes'] == ['eras.analog_mechanical']
+    assert metrics['invalidated'] >= 2
+    assert metrics['survived'] >= 1
+
+    fighter_key = ('build_panel_specification_impl', ('fighter_jets', 'hud_integration', None, 'medium'))
+    assert RESULT_CACHE.get(fighter_key) is not None
+    rebuilt = build_panel_specification('general_aviation_singles', 'analog_mechanical')
+    assert rebuilt is not analog
+    assert 'Three-pointer steam gauges' in rebuilt['era_characteristics']
+
+
+def test_reload_hashes_the_bytes_it_parsed(edited_olog, monkeypatch):
+    """An edit landing mid-reload never pairs the new hash with the old taxonomy."""
+    source = edited_olog.read_bytes()
+    edited = source.replace(b'"Three-pointer gauges"', b'"Three-pointer steam gauges"')
+
+    class EditedAfterFirstRead(type(edited_olog)):
+        reads = 0
+
+        def _read(self):
+            EditedAfterFirstRead.reads += 1
+            if EditedAfterFirstRead.reads > 1:
+                edited_olog.write_bytes(edited)
+
+        def __fspath__(self):
+            self._read()
+            return super().__fspath__()
+
+        def read_bytes(self):
+            self._read()
+            return edited_olog.read_bytes()
+
+    monkeypatch.setattr(server, "OLOG_PATH", EditedAfterFirstRead(edited_olog))
+    server.reload_taxonomy_impl()
+    assert server.TAXONOMY_HASH == hashlib.sha256(source).hexdigest()
+    assert server.materialize(server.TAXONOMY['eras']['analog_mechanical']) == yaml.safe_load(source)['eras']['analog_mechanical']
+
+
+def test_reload_reports_unknown_template_placeholders(edited_olog):
+    """A typo in an olog template drops that sentence instead of breaking rendering."""
+    edited_olog.write_text(edited_olog.read_text().replace(
+        'materials: "Built from {materials}"', 'materials: "Built from {materails}"'
+    ))
+    metrics = server.reload_taxonomy_impl()
+    assert metrics['prompt_template_errors'] == {'materials': 'Unknown placeholders: {materails}'}
+
+    prompt = render_cockpit_prompt('general_aviation_singles', 'analog_mechanical', length='long')['prompt']
+    assert 'Built from' not in prompt
+    assert 'Key instruments' in prompt
+
+
+def test_cache_stats_reports_reloads(edited_olog):
+    """Cache stats include the metrics of each reload."""
+    server.reload_taxonomy_impl()
+    stats = server.get_cache_stats_impl()
+    assert 'hits' in stats
+    assert stats['reloads'][-1]['changed_nodes'] == []
+
+
 # ============================================================================
 # Layer 3: Synthesis Tests
 # ============================================================================
@@ -267,6 +457,76 @@ def test_generate_cockpit_prompt_with_context():
     assert 'additional_context' in result['prompt_context']
 
 
+# ============================================================================
+# Deterministic Rendering Tests
+# ============================================================================
+
+def test_render_cockpit_prompt_deterministic():
+    """Identical arguments always render the identical prompt."""
+    first = render_cockpit_prompt('general_aviation_singles', 'analog_mechanical')
+    second = render_cockpit_prompt('general_aviation_singles', 'analog_mechanical')
+    assert first['prompt'] == second['prompt']
+    assert first['renderer'] == 'deterministic'
+    assert first['characters'] == len(first['prompt'])
+
+
+def test_render_cockpit_prompt_uses_olog_templates():
+    """Era, angle, lighting and intensity phrases come from the olog."""
+    templates = TAXONOMY['prompt_templates']
+    result = render_cockpit_prompt(
+        'general_aviation_singles', 'glass_cockpit',
+        viewing_angle='overhead', lighting_condition='night', detail_intensity='technical'
+    )
+    prompt = result['prompt']
+    assert templates['eras']['glass_cockpit'] in prompt
+    assert templates['viewing_angles']['overhead'] in prompt
+    assert templates['lighting']['night'] in prompt
+    assert prompt.startswith(templates['detail_intensity']['technical'])
+    assert 'Primary Flight Display (PFD)' in prompt
+
+
+def test_render_cockpit_prompt_lengths():
+    """Longer presets produce longer prompts."""
+    sizes = [
+        render_cockpit_prompt('general_aviation_singles', 'analog_mechanical', length=length)['characters']
+        for length in ('short', 'medium', 'long')
+    ]
+    assert sizes == sorted(sizes)
+    assert len(set(sizes)) == 3
+
+
+def test_render_cockpit_prompt_max_characters():
+    """max_characters trims optional sentences but keeps context."""
+    result = render_cockpit_prompt(
+        'general_aviation_singles', 'analog_mechanical',
+        additional_context='rain on the windscreen', length='long', max_characters=300
+    )
+    assert result['characters'] <= 300
+    assert 'rain on the windscreen' in result['prompt']
+    tiny = render_cockpit_prompt('general_aviation_singles', 'analog_mechanical', max_characters=40)
+    assert tiny['characters'] <= 40
+
+
+def test_render_cockpit_prompt_max_characters_boundaries():
+    """Trimmed prompts never exceed the limit and end on a whole word."""
+    core = [('core', 'Photorealistic cockpit instrument panel')]
+    assert _fit_sentences(core, 30) == 'Photorealistic cockpit.'
+    assert _fit_sentences(core, 34) == 'Photorealistic cockpit instrument.'
+    assert _fit_sentences(core, 40) == 'Photorealistic cockpit instrument panel.'
+    assert _fit_sentences(core, 12) == 'Photorealis.'  # a single word longer than the limit
+    for limit in range(MIN_PROMPT_CHARACTERS, 200):
+        prompt = render_cockpit_prompt('fighter_jets', 'glass_cockpit', max_characters=limit)['prompt']
+        assert len(prompt) <= limit and prompt.endswith('.')
+    for limit in (0, 5, MIN_PROMPT_CHARACTERS - 1):
+        assert 'error' in render_cockpit_prompt('fighter_jets', 'glass_cockpit', max_characters=limit)
+
+
+def test_render_cockpit_prompt_errors():
+    """Unknown length or aircraft type returns an error."""
+    assert 'available_lengths' in render_cockpit_prompt('general_aviation_singles', 'analog_mechanical', length='epic')
+    assert 'error' in render_cockpit_prompt('nonexistent_aircraft', 'analog_mechanical')
+
+
 # ============================================================================
 # Educational/Explanation Tests
 # ============================================================================
@@ -0,0 +1,120 @@
+"""
+Tests and load test for single-flight request coalescing.
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from cockpit_design_aesthetics import server
+from cockpit_design_aesthetics.singleflight import SingleFlight
+
+
+def _burst(fn, n, *args):
+    """Start n identical calls together and return their results."""
+    barrier = threading.Barrier(n)
+
+    def call():
+        barrier.wait()
+        return fn(*args)
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        return [f.result() for f in [pool.submit(call) for _ in range(n)]]
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    """Callers arriving while a key is in flight share its result."""
+    group = SingleFlight()
+    executions = []
+
+    def slow(x):
+        executions.append(x)
+        time.sleep(0.1)
+        return {"x": x}
+
+    results = _burst(lambda: group.do("k", slow, 1), 16)
+    assert len(executions) == 1
+    assert all(r is results[0] for r in results)
+    assert group.stats()["executed"] == 1
+    assert group.stats()["coalesced"] == 15
+    assert group.stats()["in_flight"] == 0
+    assert group.stats()["waiting"] == 0
+
+
+def test_stats_report_blocked_waiters():
+    """Callers blocked on an in-flight key are reported until it finishes."""
+    group = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return 1
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(group.do, "k", slow)
+        started.wait(5)
+        followers = [pool.submit(group.do, "k", slow) for _ in range(3)]
+        deadline = time.monotonic() + 5
+        while group.stats()["waiting"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert group.stats()["waiting"] == 3
+        release.set()
+        assert [f.result() for f in [leader, *followers]] == [1, 1, 1, 1]
+    assert group.stats()["waiting"] == 0
+
+
+def test_errors_propagate_to_all_waiters():
+    """An exception in the leader is raised in every coalesced caller."""
+    group = SingleFlight()
+
+    def failing():
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    def call():
+        with pytest.raises(ValueError):
+            group.do("k", failing)
+        return True
+
+    assert all(_burst(call, 4))
+
+
+def test_sequential_calls_are_not_coalesced():
+    """Keys are only shared while a call is in flight."""
+    group = SingleFlight()
+    group.do("k", lambda: 1)
+    group.do("k", lambda: 1)
+    assert group.stats()["executed"] == 2
+
+
+def test_load_generate_cockpit_prompt_burst(monkeypatch):
+    """Load test: a burst after a cache flush computes each prompt once."""
+    server.RESULT_CACHE.clear()
+    original = server.generate_cockpit_prompt_impl
+    executions = []
+
+    def slow_impl(*args):
+        executions.append(args)
+        time.sleep(0.2)
+        return original(*args)
+
+    monkeypatch.setattr(server, "generate_cockpit_prompt_impl", slow_impl)
+    before = server.SINGLE_FLIGHT.stats()
+
+    clients = 32
+    results = _burst(server.generate_cockpit_prompt, clients, "General Aviation Singles", "glass-cockpit")
+
+    after = server.SINGLE_FLIGHT.stats()
+    assert len(executions) == 1
+    assert after["executed"] - before["executed"] == 1
+    assert after["coalesced"] - before["coalesced"] == clients - 1
+    assert all(r["ready_for_image_generation"] for r in results)
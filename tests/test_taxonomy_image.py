@@ -0,0 +1,131 @@
+"""
+Tests for the memory-mapped compiled taxonomy image.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import yaml
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from cockpit_design_aesthetics import server
+from cockpit_design_aesthetics.taxonomy_image import (
+    ImageDict,
+    TaxonomyImage,
+    build_image,
+    ensure_image,
+    materialize,
+)
+
+
+SAMPLE = {
+    'eras': {'glass': {'period': '1990s', 'materials': ['LCD', 'glass']}},
+    'scan_patterns': {'ifr': {'sequence': {1: 'Attitude', 2: 'Altimeter'}, 'rate': 2.5}},
+    'flags': {'enabled': True, 'disabled': False, 'missing': None},
+    'masks': {'small': -5, 'wide': 1 << 400, 'negative': -(1 << 90)},
+    'unicode': {'ÄÖÜ': 'ünïcödé', 'zebra': 'z', 'alpha': 'a'},
+}
+
+
+def _image(tmp_path, root):
+    path = tmp_path / "taxonomy.img"
+    path.write_bytes(build_image(root, b"\0" * 32))
+    return TaxonomyImage(path)
+
+
+def test_image_round_trip(tmp_path):
+    """Every value survives compilation and materializes back unchanged."""
+    image = _image(tmp_path, SAMPLE)
+    assert materialize(image.root) == SAMPLE
+    assert image.root == SAMPLE
+
+
+def test_image_lookup_and_order(tmp_path):
+    """Lookups use binary search while iteration keeps olog order."""
+    root = _image(tmp_path, SAMPLE).root
+    assert isinstance(root['eras'], ImageDict)
+    assert root['scan_patterns']['ifr']['sequence'][2] == 'Altimeter'
+    assert root['unicode']['ÄÖÜ'] == 'ünïcödé'
+    assert list(root['unicode']) == ['ÄÖÜ', 'zebra', 'alpha']
+    assert 'missing' in root['flags'] and root['flags']['missing'] is None
+    assert root.get('nonexistent', 'default') == 'default'
+    assert root['eras']['glass']['materials'][-1] == 'glass'
+    assert root['eras']['glass']['materials'][:1] == ['LCD']
+
+
+def test_materialize_shares_nodes(tmp_path):
+    """Materializing the same node twice returns one object, like a parsed olog."""
+    root = _image(tmp_path, SAMPLE).root
+    eras = materialize(root['eras'])
+    assert materialize(root['eras']) is eras
+    assert materialize(root['eras']['glass']['materials']) is eras['glass']['materials']
+
+
+def test_materialize_memo_is_bounded(tmp_path):
+    """Sweeping the whole taxonomy keeps only the most recent nodes."""
+    path = tmp_path / "taxonomy.img"
+    path.write_bytes(build_image({f"k{i}": [i] for i in range(50)}, b"\0" * 32))
+    image = TaxonomyImage(path, memo_size=8)
+    first = materialize(image.root['k0'])
+    for i in range(50):
+        materialize(image.root[f"k{i}"])
+    assert len(image._materialized) == 8
+    assert materialize(image.root['k49']) is materialize(image.root['k49'])
+    assert materialize(image.root['k0']) == first
+
+
+def test_ensure_image_rebuilds_for_other_code(tmp_path):
+    """An image compiled by another build id is stale even if the olog is not."""
+    olog = tmp_path / "instruments.yaml"
+    olog.write_text(yaml.safe_dump(SAMPLE))
+    image_path = tmp_path / "taxonomy.img"
+
+    ensure_image(olog, image_path, lambda t: {}, build_id="0.1.0+1")
+    # Newer code adds an index; the old image must not be reused without it
+    image = ensure_image(olog, image_path, lambda t: {"eras": list(t['eras'])}, build_id="0.1.0+2")
+    assert image.root['indexes']['eras'] == ['glass']
+
+
+def test_ensure_image_rebuilds_when_olog_changes(tmp_path):
+    """A stale image is recompiled; a current one is reused as-is."""
+    olog = tmp_path / "instruments.yaml"
+    olog.write_text(yaml.safe_dump(SAMPLE))
+    image_path = tmp_path / "shared" / "taxonomy.img"
+
+    first = ensure_image(olog, image_path, lambda t: {"eras": list(t['eras'])})
+    assert first.root['indexes']['eras'] == ['glass']
+    mtime = image_path.stat().st_mtime_ns
+    ensure_image(olog, image_path, lambda t: {})
+    assert image_path.stat().st_mtime_ns == mtime
+
+    olog.write_text(yaml.safe_dump({**SAMPLE, 'eras': {'hud': {}}}))
+    rebuilt = ensure_image(olog, image_path, lambda t: {"eras": list(t['eras'])})
+    assert rebuilt.root['indexes']['eras'] == ['hud']
+
+
+def test_server_results_identical_from_image(tmp_path, monkeypatch):
+    """Tool results from a mapped image match the parsed-YAML results."""
+    expected = server.build_panel_specification_impl.__wrapped__(
+        'general_aviation_singles', 'glass_cockpit', None, 'comprehensive'
+    )
+    rendered = server.render_cockpit_prompt_impl('general_aviation_singles', 'glass_cockpit')
+    details = server.get_instrument_details_impl('altimeter')
+
+    image = ensure_image(server.OLOG_PATH, tmp_path / "taxonomy.img", server._compile_indexes)
+    for name in ('TAXONOMY', 'TAXONOMY_HASH', 'ERA_COMPATIBILITY', 'PROMPT_TEMPLATES',
+                 'SCHEMATIC_FRAGMENTS', 'TAXONOMY_IMAGE'):
+        monkeypatch.setattr(server, name, getattr(server, name))
+    server._use_taxonomy_image(image)
+
+    assert server.build_panel_specification_impl.__wrapped__(
+        'general_aviation_singles', 'glass_cockpit', None, 'comprehensive'
+    ) == expected
+    assert server.render_cockpit_prompt_impl('general_aviation_singles', 'glass_cockpit') == rendered
+    mapped_details = server.get_instrument_details_impl('altimeter')
+    assert mapped_details == details
+    json.dumps(mapped_details)
+    assert 'shared_image' in server.get_memory_report_impl()['taxonomy']
@@ -0,0 +1,136 @@
+"""
+Tests for traffic recording and replay.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from fastmcp import Client
+
+from cockpit_design_aesthetics import server
+from cockpit_design_aesthetics.traffic import (
+    TrafficRecorder,
+    TrafficRecordingMiddleware,
+    diff_paths,
+    percentiles,
+    read_recording,
+    replay,
+)
+
+
+CALLS = [
+    ("get_instrument_details", {"instrument_name": "altimeter"}),
+    ("build_panel_specification", {"aircraft_type": "Fighter Jets", "panel_era": "hud-integration"}),
+    ("list_available_options", {}),
+    ("get_era_profile", {"era": "no_such_era"}),
+]
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """Record CALLS through the real server with responses included."""
+    recorder = TrafficRecorder(
+        tmp_path / "traffic.jsonl", normalize=server.normalize_tool_arguments, include_responses=True
+    )
+    middleware = TrafficRecordingMiddleware(recorder)
+    server.mcp.add_middleware(middleware)
+    try:
+        async def run():
+            async with Client(server.mcp) as client:
+                for name, arguments in CALLS:
+                    await client.call_tool(name, arguments)
+        asyncio.run(run())
+    finally:
+        server.mcp.middleware.remove(middleware)
+        recorder.close()
+    return tmp_path / "traffic.jsonl"
+
+
+def _replay(entries, **kwargs):
+    async def run():
+        async with Client(server.mcp) as client:
+            return await replay(entries, client, **kwargs)
+    return asyncio.run(run())
+
+
+def test_recorder_writes_normalized_entries(recording):
+    entries = read_recording(recording)
+    assert [entry["tool"] for entry in entries] == [name for name, _ in CALLS]
+
+    spec = entries[1]
+    assert spec["args"] == {
+        "aircraft_type": "fighter_jets", "detail_level": "medium",
+        "focus_area": None, "panel_era": "hud_integration"
+    }
+    assert spec["latency_ms"] >= 0
+    assert spec["response_bytes"] == len(json.dumps(spec["response"], sort_keys=True, separators=(",", ":")))
+    assert all(entry["is_error"] is False for entry in entries)
+
+
+def test_normalize_keeps_spelling_for_tools_that_echo_it():
+    assert server.normalize_tool_arguments("suggest_instruments", {"aircraft_type": "Fighter Jets"}) == {
+        "aircraft_type": "Fighter Jets", "complexity_level": None,
+        "mission_profile": None, "panel_era": None
+    }
+    assert server.normalize_tool_arguments("no_such_tool", {"b": 1, "a": 2}) == {"a": 2, "b": 1}
+
+
+def test_recorder_rotates_and_reads_backups_in_order(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(path, max_bytes=1000, backup_count=10)
+
+    class Result:
+        structured_content = {"ok": True}
+        content = []
+        is_error = False
+
+    for i in range(20):
+        recorder.record("get_color_standards", {"n": i}, started=1000.0 + i, latency=0.001, result=Result())
+    recorder.close()
+
+    assert (tmp_path / "traffic.jsonl.1").exists()
+    entries = read_recording(path)
+    assert [entry["args"]["n"] for entry in entries] == list(range(20))
+    assert recorder.stats()["recorded"] == 20
+
+
+def test_replay_reproduces_recording(recording):
+    report = _replay(read_recording(recording), speed=None, concurrency=4)
+    assert report["calls"] == len(CALLS)
+    assert report["errors"] == 0
+    assert report["mismatches"] == 0
+    assert set(report["latency_ms"]) == {"p50", "p90", "p99", "max"}
+    assert report["by_tool"]["get_instrument_details"]["calls"] == 1
+
+
+def test_replay_diffs_changed_responses(recording):
+    entries = read_recording(recording)
+    entries[0]["response"]["criticality"] = "edited"
+    entries[0]["response_sha256"] = "0" * 64
+
+    report = _replay(entries, speed=None)
+    assert report["mismatches"] == 1
+    assert report["mismatch_examples"][0]["diff"] == ["$.criticality"]
+
+
+def test_replay_follows_recorded_schedule(recording):
+    entries = read_recording(recording)
+    for i, entry in enumerate(entries):
+        entry["ts"] = 100.0 + i * 0.1  # 0.3s of recorded traffic
+
+    report = _replay(entries, speed=2.0)
+    assert report["duration_s"] >= 0.15
+    assert report["speed"] == 2.0
+
+
+def test_percentiles_and_diff_paths():
+    assert percentiles(list(range(1, 101))) == {"p50": 50, "p90": 90, "p99": 99, "max": 100}
+    assert diff_paths({"a": [1, 2], "b": 1}, {"a": [1, 3], "c": 1}) == ["$.a[1]", "$.b", "$.c"]